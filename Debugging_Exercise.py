@@ -1,3 +1,31 @@
+import argparse
+import csv
+import gc
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the columnar catalog engine
+    np = None
+
+CHUNK_ROWS = 50_000  # catalog rows priced per chunk (small enough to stay cache-friendly)
+# Error mask bits for catalog rows
+ERR_PRICE = 1       # price missing, not a number, negative or not finite
+ERR_RATE = 2        # discount rate missing, not a number or outside 0..1
+ERR_MALFORMED = 4   # row has the wrong number of fields / is not a JSON object
+ERROR_NAMES = {ERR_PRICE: "invalid price", ERR_RATE: "invalid discount rate",
+               ERR_MALFORMED: "malformed row"}
+
 def calculate_discount(price, discount_rate):
     """Calculate the discount amount based on the price and discount rate."""
     return price * discount_rate
@@ -6,6 +34,445 @@ def apply_discount(price, discount_amount):
     """Apply the discount amount to the original price and return the new price."""
     return price - discount_amount
 
+def _to_float(value):
+    """float(value), or NaN when value is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def coerce_floats(values):
+    """Convert a column of numbers/strings to float64 in bulk; bad entries become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Some entry is not a number: parse element-wise, NaN marks the bad ones
+        return np.fromiter(map(_to_float, values), dtype=np.float64, count=len(values))
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic GC while a chunk's row objects are built.
+
+    Each chunk allocates hundreds of thousands of short-lived lists/dicts, none
+    of them cyclic; left on, the collector rescans them over and over and more
+    than doubles the load time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _csv_chunks(path, chunk_rows):
+    """Yield (names, prices, rates, malformed) column lists from a CSV catalog."""
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader([f.readline()]), [])
+        if "price" not in header or "discount_rate" not in header:
+            raise ValueError(f"{path}: CSV needs price and discount_rate columns")
+        width = len(header)
+        picks = [header.index("price"), header.index("discount_rate")]
+        name_col = header.index("name") if "name" in header else None
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                return
+            with _gc_paused():
+                columns, malformed = _split_csv_chunk(lines, width)
+            names = columns[name_col] if name_col is not None else [""] * len(malformed)
+            yield names, columns[picks[0]], columns[picks[1]], malformed
+
+def _split_csv_chunk(lines, width):
+    """Split a chunk of CSV lines into column lists.
+
+    Plain chunks (no quotes, every row the right width) are split with one
+    str.split over the whole chunk and sliced into columns, all in C; anything
+    else goes through the csv module row by row.  Widths are checked per row,
+    so a short row and a long row cannot add up to two good ones.  Only the
+    line terminator is stripped (str.splitlines would also split on form
+    feeds and other separators that are legal inside a field), so each line
+    is exactly one row.
+    """
+    if '"' not in lines[0] and not any('"' in line for line in lines):
+        rows = [line.rstrip("\r\n") for line in lines]
+        if set(map(str.count, rows, itertools.repeat(","))) == {width - 1}:
+            fields = ",".join(rows).split(",")
+            return [fields[i::width] for i in range(width)], [False] * len(rows)
+    rows = list(csv.reader(lines))
+    malformed = [len(row) != width for row in rows]
+    if any(malformed):
+        rows = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+    return list(zip(*rows)), malformed
+
+def _jsonl_chunks(path, chunk_rows):
+    """Yield (names, prices, rates, malformed) column lists from a JSONL catalog."""
+    with open(path, encoding="utf-8") as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                return
+            with _gc_paused():
+                try:
+                    # one parser call for the whole chunk
+                    products = json.loads("[" + ",".join(lines) + "]")
+                    # a line holding two objects would otherwise pass as two rows
+                    if len(products) != len(lines) or not all(isinstance(p, dict) for p in products):
+                        raise ValueError
+                except ValueError:
+                    # blank lines, bad JSON or non-objects: parse line by line
+                    products = [_parse_product(line) for line in lines if line.strip()]
+                    if not products:
+                        continue
+            malformed = [p is None for p in products]
+            if any(malformed):
+                products = [p if p is not None else {} for p in products]
+            yield ([p.get("name", "") for p in products], [p.get("price") for p in products],
+                   [p.get("discount_rate") for p in products], malformed)
+
+def _parse_product(line):
+    try:
+        product = json.loads(line)
+    except ValueError:
+        return None
+    return product if isinstance(product, dict) else None
+
+def iter_catalog_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a CSV or JSONL catalog as column chunks of at most chunk_rows rows.
+
+    Each chunk is a dict of NumPy arrays: name, price, discount_rate and errors
+    (a bit mask per row, 0 when the row is valid). Nothing raises for a bad row.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the columnar catalog engine.")
+    jsonl = path.endswith((".jsonl", ".ndjson"))
+    for names, prices, rates, malformed in (_jsonl_chunks if jsonl else _csv_chunks)(path, chunk_rows):
+        price = coerce_floats(prices)
+        rate = coerce_floats(rates)
+        errors = np.where(~np.isfinite(price) | (price < 0), ERR_PRICE, 0)
+        errors |= np.where(~np.isfinite(rate) | (rate < 0) | (rate > 1), ERR_RATE, 0)
+        errors[np.array(malformed)] = ERR_MALFORMED
+        yield {"name": np.array(names, dtype=object), "price": price,
+               "discount_rate": rate, "errors": errors.astype(np.uint8)}
+
+def price_chunk(chunk):
+    """Add discount_amount and final_price columns (NaN for invalid rows) to a chunk."""
+    valid = chunk["errors"] == 0
+    price = np.where(valid, chunk["price"], np.nan)
+    discount_amount = calculate_discount(price, np.where(valid, chunk["discount_rate"], np.nan))
+    chunk["discount_amount"] = discount_amount
+    chunk["final_price"] = apply_discount(price, discount_amount)
+    return chunk
+
+def price_catalog(path, chunk_rows=CHUNK_ROWS, output=None):
+    """
+    Price a whole catalog chunk by chunk, so memory use is bounded by chunk_rows.
+
+    With output, priced rows are written there as CSV (invalid rows keep their
+    error text instead of prices). Returns a summary dict of counts and totals.
+    """
+    summary = {"rows": 0, "valid": 0, "original_total": 0.0, "discount_total": 0.0,
+               "final_total": 0.0, "errors": {name: 0 for name in ERROR_NAMES.values()}}
+    out = open(output, "w", newline="", encoding="utf-8") if output else None
+    try:
+        writer = csv.writer(out) if out else None
+        if writer:
+            writer.writerow(["name", "price", "discount_rate", "discount_amount", "final_price", "error"])
+        for chunk in iter_catalog_chunks(path, chunk_rows):
+            price_chunk(chunk)
+            valid = chunk["errors"] == 0
+            summary["rows"] += len(valid)
+            summary["valid"] += int(valid.sum())
+            summary["original_total"] += float(chunk["price"][valid].sum())
+            summary["discount_total"] += float(chunk["discount_amount"][valid].sum())
+            summary["final_total"] += float(chunk["final_price"][valid].sum())
+            for bit, name in ERROR_NAMES.items():
+                summary["errors"][name] += int(np.count_nonzero(chunk["errors"] & bit))
+            if writer:
+                _write_priced(writer, chunk)
+    finally:
+        if out:
+            out.close()
+    return summary
+
+def _write_priced(writer, chunk):
+    # Format each numeric column with one map() call, then blank the invalid rows
+    money = "{:.2f}".format
+    columns = [list(map(money, chunk[c].tolist())) for c in ("price", "discount_amount", "final_price")]
+    rates = list(map("{:g}".format, chunk["discount_rate"].tolist()))
+    error_text = [""] * len(rates)
+    for index in np.flatnonzero(chunk["errors"]).tolist():
+        bits = int(chunk["errors"][index])
+        error_text[index] = "; ".join(name for bit, name in ERROR_NAMES.items() if bits & bit)
+        columns[0][index] = columns[1][index] = columns[2][index] = ""
+        if bits & ERR_MALFORMED:
+            rates[index] = ""
+    writer.writerows(zip(chunk["name"].tolist(), columns[0], rates, columns[1], columns[2], error_text))
+
+class DiscountRule(NamedTuple):
+    """One discount; None fields match anything. Quantities and dates are inclusive."""
+    rate: float
+    category: Optional[str] = None
+    min_quantity: int = 1
+    max_quantity: Optional[int] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    def active_on(self, day):
+        return (self.start is None or self.start <= day) and (self.end is None or day <= self.end)
+
+class DiscountRuleEngine:
+    """
+    Stacked discount rules keyed by category, quantity tier and date window.
+
+    Rules are compiled per category into quantity tiers (sorted boundaries plus
+    the rules covering each tier), so a lookup is one bisect and a date check
+    on a handful of rules. Every matching rule stacks on the product's own
+    discount_rate: effective = 1 - (1 - base) * prod(1 - rule.rate). Resolved
+    rates are memoized per (category, base rate, quantity, date) in an LRU
+    cache, which is cleared whenever the rules change.
+    """
+
+    def __init__(self, rules=(), cache_size=65_536):
+        self.rules = []
+        self.version = 0
+        self._changes = {}  # category (None for all) -> version of its latest rule edit
+        self._tiers = {}    # category -> (boundaries, rules per tier), built on demand
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_rate)
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        if not 0 <= rule.rate <= 1:
+            raise ValueError(f"discount rate must be between 0 and 1: {rule.rate}")
+        self.rules.append(rule)
+        self._rules_changed(rule.category)
+
+    def remove_rule(self, rule):
+        self.rules.remove(rule)
+        self._rules_changed(rule.category)
+
+    def _rules_changed(self, category):
+        self.version += 1
+        self._changes[category] = self.version
+        self._tiers.clear()
+        self._resolve.cache_clear()
+
+    def changed_since(self, version):
+        """Categories whose rules changed after version (None in the set means all)."""
+        return {category for category, changed in self._changes.items() if changed > version}
+
+    def date_sensitive(self, category, old_day, new_day):
+        """True if moving from old_day to new_day turns any of the category's rules on or off."""
+        return any(rule.active_on(old_day) != rule.active_on(new_day)
+                   for rule in self.rules if rule.category in (None, category))
+
+    def _compile(self, category):
+        rules = [rule for rule in self.rules if rule.category in (None, category)]
+        edges = {1}
+        for rule in rules:
+            edges.add(rule.min_quantity)
+            if rule.max_quantity is not None:
+                edges.add(rule.max_quantity + 1)
+        boundaries = sorted(edges)
+        tiers = [[rule for rule in rules if rule.min_quantity <= low
+                  and (rule.max_quantity is None or low <= rule.max_quantity)]
+                 for low in boundaries]
+        self._tiers[category] = boundaries, tiers
+        return boundaries, tiers
+
+    def _resolve_rate(self, category, base_rate, quantity, day):
+        boundaries, tiers = self._tiers.get(category) or self._compile(category)
+        tier = bisect_right(boundaries, quantity) - 1
+        keep = 1 - base_rate
+        matched = False
+        if tier >= 0:
+            for rule in tiers[tier]:
+                if rule.active_on(day):
+                    keep *= 1 - rule.rate
+                    matched = True
+        # with no rule the base rate is returned as is (1 - (1 - base) can round)
+        return 1 - keep if matched else base_rate
+
+    def effective_rate(self, category, base_rate=0.0, quantity=1, day=None):
+        """Combined discount rate for a product in a context (memoized)."""
+        return self._resolve(category, base_rate, quantity, day or date.today())
+
+    def price(self, price, category, base_rate=0.0, quantity=1, day=None):
+        """Return (effective rate, discount amount, final price) using the rules."""
+        rate = self.effective_rate(category, base_rate, quantity, day)
+        discount_amount = calculate_discount(price, rate)
+        return rate, discount_amount, apply_discount(price, discount_amount)
+
+class Repricer:
+    """
+    Keeps a priced catalog up to date, recomputing only what changed.
+
+    A product is repriced when its own inputs change (upsert), when a rule for
+    its category (or a catch-all rule) is added or removed, or when the pricing
+    date moves across the start/end of one of its category's rules.
+    """
+
+    def __init__(self, engine, day=None):
+        self.engine = engine
+        self.day = day or date.today()
+        self.products = {}  # sku -> (price, category, base rate, quantity)
+        self.prices = {}    # sku -> (effective rate, discount amount, final price)
+        self._by_category = {}
+        self._dirty = set()
+        self._dirty_categories = set()
+        self._version = engine.version
+
+    def upsert(self, sku, price, category, discount_rate=0.0, quantity=1):
+        inputs = (price, category, discount_rate, quantity)
+        old = self.products.get(sku)
+        if old == inputs:
+            return
+        if old is not None and old[1] != category:
+            self._by_category[old[1]].discard(sku)
+        self.products[sku] = inputs
+        self._by_category.setdefault(category, set()).add(sku)
+        self._dirty.add(sku)
+
+    def remove(self, sku):
+        inputs = self.products.pop(sku, None)
+        if inputs is not None:
+            self._by_category[inputs[1]].discard(sku)
+            self.prices.pop(sku, None)
+            self._dirty.discard(sku)
+
+    def set_day(self, day):
+        if day != self.day:
+            self._dirty_categories.update(category for category in self._by_category
+                                          if self.engine.date_sensitive(category, self.day, day))
+            self.day = day
+
+    def reprice(self):
+        """Reprice the changed products; return {sku: (rate, discount, final)} for them."""
+        changed = self.engine.changed_since(self._version)
+        self._version = self.engine.version
+        categories = self._dirty_categories
+        if None in changed:
+            categories = self._by_category.keys()
+        else:
+            categories |= changed
+        dirty = self._dirty
+        for category in categories:
+            dirty |= self._by_category.get(category, set())
+        updates = {}
+        price_with_rules = self.engine.price
+        for sku in dirty:
+            price, category, base_rate, quantity = self.products[sku]
+            updates[sku] = price_with_rules(price, category, base_rate, quantity, self.day)
+        self.prices.update(updates)
+        self._dirty = set()
+        self._dirty_categories = set()
+        return updates
+
+def benchmark_rules(products=200_000, categories=50, rules=300, seed=0):
+    """Time full repricing with and without the rate cache, then incremental updates."""
+    rng = random.Random(seed)
+    names = [f"cat-{i}" for i in range(categories)]
+    start_day = date(2024, 1, 1)
+    rule_list = []
+    for _ in range(rules):
+        low = rng.choice((1, 1, 5, 10, 50))
+        begin = start_day + timedelta(days=rng.randrange(0, 300))
+        rule_list.append(DiscountRule(rate=rng.choice((0.02, 0.05, 0.1)),
+                                      category=rng.choice(names + [None]) if rng.random() < 0.95 else None,
+                                      min_quantity=low, max_quantity=rng.choice((None, low * 10)),
+                                      start=begin if rng.random() < 0.5 else None,
+                                      end=begin + timedelta(days=30) if rng.random() < 0.5 else None))
+    catalog = [(f"SKU-{i}", round(rng.uniform(1, 2000), 2), rng.choice(names),
+                rng.choice((0, 0.05, 0.1)), rng.choice((1, 2, 5, 10, 20, 100)))
+               for i in range(products)]
+    day = date(2024, 6, 1)
+
+    def timed(label, func):
+        begin = time.perf_counter()
+        count = len(func())
+        elapsed = time.perf_counter() - begin
+        print(f"{label:38} {count:>9,} repriced in {elapsed:7.3f} s {count / elapsed:12,.0f} products/s")
+
+    print(f"\n{products:,} products, {categories} categories, {rules} rules:")
+    uncached = DiscountRuleEngine(rule_list, cache_size=0)
+    timed("full repricing, no rate cache", lambda: [uncached.price(p, c, b, q, day)
+                                                    for _, p, c, b, q in catalog])
+    engine = DiscountRuleEngine(rule_list)
+    repricer = Repricer(engine, day)
+    for sku, price, category, base, quantity in catalog:
+        repricer.upsert(sku, price, category, base, quantity)
+    timed("full repricing, LRU rate cache", repricer.reprice)
+
+    for sku, price, category, base, quantity in rng.sample(catalog, products // 100):
+        repricer.upsert(sku, price * 1.05, category, base, quantity)
+    timed("incremental: 1% of prices changed", repricer.reprice)
+    engine.add_rule(DiscountRule(0.15, category=names[0], min_quantity=10))
+    timed("incremental: one category rule added", repricer.reprice)
+    repricer.set_day(day + timedelta(days=1))
+    timed("incremental: next day", repricer.reprice)
+
+def _write_sample_catalog(path, rows, seed=0):
+    """Write a random CSV or JSONL catalog with about 1 % bad prices/rates."""
+    rng = random.Random(seed)
+    jsonl = path.endswith(".jsonl")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None if jsonl else csv.writer(f)
+        if writer:
+            writer.writerow(["name", "price", "discount_rate"])
+        for i in range(rows):
+            price = round(rng.uniform(1, 2000), 2)
+            rate = rng.choice((0, 0.05, 0.1, 0.15, 0.2, 0.25))
+            roll = rng.random()
+            if roll < 0.005:
+                price = rng.choice(("N/A", "", "abc"))
+            elif roll < 0.01:
+                rate = rng.choice(("", "1.5", "-0.1"))
+            elif roll < 0.3:
+                price = str(price)  # a number as text, like the "500" in main()
+            if jsonl:
+                f.write(json.dumps({"name": f"SKU-{i}", "price": price, "discount_rate": rate}) + "\n")
+            else:
+                writer.writerow([f"SKU-{i}", price, rate])
+
+def _price_rows_loop(path):
+    """The original per-product loop (float() and try/except per row), as a baseline."""
+    total = 0.0
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            products = (json.loads(line) for line in f)
+        else:
+            products = csv.DictReader(f)
+        for product in products:
+            try:
+                price = float(product["price"])
+                discount_rate = float(product["discount_rate"])
+                total += apply_discount(price, calculate_discount(price, discount_rate))
+            except (TypeError, ValueError):
+                pass
+    return total
+
+def benchmark(rows=1_000_000, chunk_rows=CHUNK_ROWS):
+    """Compare rows/second of the per-row loop and the chunked columnar engine."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("csv", "jsonl"):
+            path = os.path.join(tmp, f"catalog.{ext}")
+            _write_sample_catalog(path, rows)
+            timings = []
+            start = time.perf_counter()
+            _price_rows_loop(path)
+            timings.append(("per-row loop", time.perf_counter() - start))
+            start = time.perf_counter()
+            price_catalog(path, chunk_rows)
+            timings.append(("columnar, chunked", time.perf_counter() - start))
+            start = time.perf_counter()
+            price_catalog(path, chunk_rows, os.path.join(tmp, "priced.csv"))
+            timings.append(("columnar + CSV output", time.perf_counter() - start))
+            print(f"\n{ext.upper()} catalog, {rows:,} rows:")
+            for name, seconds in timings:
+                print(f"{name:22} {seconds:7.2f} s {rows / seconds:12,.0f} rows/s")
+
 def main():
     products = [
         {"name": "Laptop", "price": 1000, "discount_rate": 0.1},
@@ -33,5 +500,32 @@ def main():
         except TypeError:
             print(f"Error: Invalid type detected in product data for {product['name']}.")
 
+def cli():
+    """Command-line entry point; without arguments the sample products are priced."""
+    parser = argparse.ArgumentParser(description="Product discount pricing")
+    parser.add_argument("catalog", nargs="?", help="CSV (name,price,discount_rate) or JSONL catalog to price")
+    parser.add_argument("-o", "--output", help="write priced rows to this CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows priced per chunk")
+    parser.add_argument("--benchmark", action="store_true", help="benchmark the catalog engine")
+    parser.add_argument("--benchmark-rules", action="store_true", help="benchmark the discount rule engine")
+    args = parser.parse_args()
+
+    if args.benchmark or args.benchmark_rules:
+        if args.benchmark:
+            benchmark(chunk_rows=args.chunk_rows)
+        if args.benchmark_rules:
+            benchmark_rules()
+    elif args.catalog:
+        summary = price_catalog(args.catalog, args.chunk_rows, args.output)
+        print(f"Rows: {summary['rows']:,} ({summary['valid']:,} valid)")
+        print(f"Original Total: ${summary['original_total']:,.2f}")
+        print(f"Discount Total: ${summary['discount_total']:,.2f}")
+        print(f"Final Total: ${summary['final_total']:,.2f}")
+        for name, count in summary["errors"].items():
+            if count:
+                print(f"Rows with {name}: {count:,}")
+    else:
+        main()
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -1,39 +1,655 @@
+import argparse
+import itertools
+import os
 import random
+import time
+from array import array
+from collections.abc import MutableSequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batches of decks
+    np = None
+
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+DECK_SIZE = len(SUITS) * len(RANKS)
+
+
+def card_code(suit, rank):
+    """Returns the integer code (0..51) of a card: suit index * 13 + rank index."""
+    return SUITS.index(suit) * len(RANKS) + RANKS.index(rank)
+
+
+def card_name(code):
+    """Returns the display name of an integer-coded card."""
+    return _NAMES[code]
 
 
 class Card:
-    """Represents a single playing card."""
+    """Represents a single playing card.
 
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
+    The 52 standard cards are interned: Card('Hearts', '2') always returns the
+    same slotted instance, so building a deck allocates nothing.  ``code`` is
+    the card's integer encoding (None for a non-standard card).  Because the
+    instances are shared, cards are immutable: setting or deleting an
+    attribute raises AttributeError.
+    """
+
+    __slots__ = ('suit', 'rank', 'code', '_name')
+
+    def __new__(cls, suit, rank):
+        card = _INTERNED.get((suit, rank))
+        if card is not None:
+            return card
+        return _make_card(cls, suit, rank, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Card is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Card is immutable; cannot delete {name!r}")
+
+    @classmethod
+    def from_code(cls, code):
+        """Returns the interned card for an integer code."""
+        return _CARDS[code]
 
     def __str__(self):
-        return f"{self.rank} of {self.suit}"
+        return self._name
 
     def __repr__(self):
         return self.__str__()
 
 
+def _make_card(cls, suit, rank, code):
+    # Card.__setattr__ refuses all writes, so the slots are filled directly
+    card = object.__new__(cls)
+    object.__setattr__(card, 'suit', suit)
+    object.__setattr__(card, 'rank', rank)
+    object.__setattr__(card, 'code', code)
+    object.__setattr__(card, '_name', f"{rank} of {suit}")
+    return card
+
+
+def _intern_cards():
+    return [_make_card(Card, SUITS[code // len(RANKS)], RANKS[code % len(RANKS)], code)
+            for code in range(DECK_SIZE)]
+
+
+_CARDS = _intern_cards()
+_INTERNED = {(card.suit, card.rank): card for card in _CARDS}
+_NAMES = [card._name for card in _CARDS]
+_FRESH_DECK = array('b', range(DECK_SIZE))
+
+
+class CompactDeck:
+    """A deck of integer-coded cards in an array, dealt from the top in O(1).
+
+    Dealing only moves a position; shuffle() and reset() restore all 52
+    cards, so one deck can be reused for many hands.  For simulations,
+    reset() followed by deal_random() skips the 52-card shuffle entirely:
+    each draw swaps a uniformly chosen undealt card to the top (a
+    Fisher-Yates step done on demand), so a 5-card hand costs 5 random
+    numbers instead of 51.
+    """
+
+    __slots__ = ('codes', 'top')
+
+    def __init__(self):
+        self.codes = array('b', _FRESH_DECK)
+        self.top = DECK_SIZE
+
+    def __len__(self):
+        return self.top
+
+    def reset(self):
+        """Returns all dealt cards to the deck without shuffling."""
+        self.top = len(self.codes)
+
+    def shuffle(self):
+        self.top = len(self.codes)
+        random.shuffle(self.codes)
+
+    def deal_random(self):
+        """Returns a uniformly random undealt card code (or -1 if empty)."""
+        top = self.top
+        if top == 0:
+            return -1
+        codes = self.codes
+        pick = int(random.random() * top)
+        top -= 1
+        code = codes[pick]
+        codes[pick] = codes[top]
+        codes[top] = code
+        self.top = top
+        return code
+
+    def deal(self):
+        """Returns the next card code (or -1 if the deck is empty)."""
+        if self.top == 0:
+            return -1
+        self.top -= 1
+        return self.codes[self.top]
+
+    def deal_many(self, count):
+        """Returns the next count card codes in dealing order."""
+        count = min(count, self.top)
+        dealt = self.codes[self.top - count:self.top][::-1]
+        self.top -= count
+        return dealt
+
+    def remaining(self):
+        """Returns the undealt codes, bottom card first."""
+        return self.codes[:self.top]
+
+
+def _code_of(card):
+    if not isinstance(card, Card) or card.code is None:
+        raise ValueError(f"{card!r} is not one of the 52 standard cards")
+    return card.code
+
+
+class DeckCards(MutableSequence):
+    """The undealt cards of a CompactDeck as a list of Cards, bottom card first.
+
+    Reads turn codes into interned Cards; writes (item and slice assignment,
+    del, insert, append, pop, random.shuffle, ...) go straight to the deck's
+    code array, so Deck.cards can be used like the list it used to be.  Only
+    the 52 standard cards can be stored.
+    """
+
+    __slots__ = ('_deck',)
+
+    def __init__(self, deck):
+        self._deck = deck
+
+    def _store(self, codes):
+        deck = self._deck
+        deck.codes[:deck.top] = codes
+        deck.top = len(codes)
+
+    def __len__(self):
+        return self._deck.top
+
+    def __iter__(self):
+        return (_CARDS[code] for code in self._deck.remaining())
+
+    def __getitem__(self, index):
+        codes = self._deck.remaining()
+        if isinstance(index, slice):
+            return [_CARDS[code] for code in codes[index]]
+        return _CARDS[codes[index]]
+
+    def __setitem__(self, index, value):
+        codes = self._deck.remaining()
+        if isinstance(index, slice):
+            codes[index] = array('b', map(_code_of, value))
+        else:
+            codes[index] = _code_of(value)
+        self._store(codes)
+
+    def __delitem__(self, index):
+        codes = self._deck.remaining()
+        del codes[index]
+        self._store(codes)
+
+    def insert(self, index, value):
+        codes = self._deck.remaining()
+        codes.insert(index, _code_of(value))
+        self._store(codes)
+
+    def __eq__(self, other):
+        if isinstance(other, (DeckCards, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Deck:
-    """Represents a deck of 52 cards."""
+    """Represents a deck of 52 cards.
+
+    A view over a CompactDeck: cards are stored as integer codes and turned
+    into interned Card objects only when dealt or listed.
+    """
 
     def __init__(self):
-        self.cards = []
-        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-        for suit in suits:
-            for rank in ranks:
-                self.cards.append(Card(suit, rank))
+        self.compact = CompactDeck()
+
+    @property
+    def cards(self):
+        """The undealt cards, bottom card first, as a list-like DeckCards view."""
+        return DeckCards(self.compact)
+
+    @cards.setter
+    def cards(self, cards):
+        """Replaces the whole deck (dealt cards included) with cards."""
+        compact = self.compact
+        if isinstance(cards, DeckCards) and cards._deck is compact:
+            return  # deck.cards += [...] has already extended the deck in place
+        compact.codes = array('b', map(_code_of, cards))
+        compact.top = len(compact.codes)
+
+    def __len__(self):
+        return len(self.compact)
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        """Shuffles the undealt cards."""
+        compact = self.compact
+        remaining = compact.remaining()
+        random.shuffle(remaining)
+        compact.codes[:compact.top] = remaining
 
     def deal_card(self):
         """Returns one card from the deck (or None if the deck is empty)."""
-        if self.cards:
-            return self.cards.pop()
+        code = self.compact.deal()
+        if code < 0:
+            return None
+        return _CARDS[code]
+
+
+class DeckBatch:
+    """Many independent decks as one (n_decks, 52) NumPy array of card codes.
+
+    shuffle() permutes every row at once and deal(k) returns the next k cards
+    of every deck as an (n_decks, k) view, so a whole batch of hands costs a
+    couple of array operations.
+    """
+
+    def __init__(self, n_decks, rng=None):
+        if np is None:
+            raise ImportError("NumPy is required for batches of decks.")
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.codes = np.tile(np.arange(DECK_SIZE, dtype=np.int8), (n_decks, 1))
+        self.top = DECK_SIZE
+
+    def __len__(self):
+        return len(self.codes)
+
+    def shuffle(self):
+        self.top = DECK_SIZE
+        self.codes = self.rng.permuted(self.codes, axis=1)
+
+    def deal(self, count=1):
+        """Returns the next count cards of every deck, shape (n_decks, count)."""
+        if count > self.top:
+            raise ValueError(f"only {self.top} cards left in each deck")
+        dealt = self.codes[:, self.top - count:self.top][:, ::-1]
+        self.top -= count
+        return dealt
+
+
+# --------------------------------------------------------------------------- #
+# Hand evaluation
+# --------------------------------------------------------------------------- #
+# Hand values run from 1 (royal flush) to 7462 (7-5-4-3-2 offsuit); lower wins.
+HAND_CLASSES = [  # (worst value in the class, name), best class first
+    (10, "Straight Flush"), (166, "Four of a Kind"), (322, "Full House"),
+    (1599, "Flush"), (1609, "Straight"), (2467, "Three of a Kind"),
+    (3325, "Two Pair"), (6185, "One Pair"), (7462, "High Card"),
+]
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]  # one per rank, 2..Ace
+TABLE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".poker_cache",
+                           "hand_tables.bin")
+_TABLE_MAGIC = b"HANDEVAL1"
+
+# Straights as rank bitmasks, Ace-high first and the 5-high "wheel" last
+_STRAIGHTS = [0b11111 << low for low in range(8, -1, -1)] + [0b1000000001111]
+
+
+def _pack_card(code):
+    """Packs a card code as prime | rank << 8 | suit bit << 12 | rank bit << 16."""
+    rank, suit = code % len(RANKS), code // len(RANKS)
+    return PRIMES[rank] | rank << 8 | 0x1000 << suit | 1 << (16 + rank)
+
+
+_PACKED = [_pack_card(code) for code in range(DECK_SIZE)]
+
+
+def build_hand_tables():
+    """
+    Builds the lookup tables by listing every hand class from best to worst.
+
+    Returns:
+        tuple: (flush, unique, products, values) -- flush/unique map a 13-bit
+        rank mask to a value for flushes and for five distinct ranks; products
+        (sorted) and values map the prime product of any hand with a repeated
+        rank to its value.
+    """
+    flush = array('H', bytes(2 * 8192))
+    unique = array('H', bytes(2 * 8192))
+    paired = {}
+    value = 1
+    descending = range(len(RANKS) - 1, -1, -1)
+    high_cards = [sum(1 << r for r in ranks) for ranks in itertools.combinations(descending, 5)]
+    high_cards = [mask for mask in high_cards if mask not in _STRAIGHTS]
+
+    for mask in _STRAIGHTS:
+        flush[mask] = value
+        value += 1
+    for quad in descending:
+        for kicker in descending:
+            if kicker != quad:
+                paired[PRIMES[quad] ** 4 * PRIMES[kicker]] = value
+                value += 1
+    for trips in descending:
+        for pair in descending:
+            if pair != trips:
+                paired[PRIMES[trips] ** 3 * PRIMES[pair] ** 2] = value
+                value += 1
+    for mask in high_cards:
+        flush[mask] = value
+        value += 1
+    for mask in _STRAIGHTS:
+        unique[mask] = value
+        value += 1
+    for trips in descending:
+        kickers = [r for r in descending if r != trips]
+        for k1, k2 in itertools.combinations(kickers, 2):
+            paired[PRIMES[trips] ** 3 * PRIMES[k1] * PRIMES[k2]] = value
+            value += 1
+    for high, low in itertools.combinations(descending, 2):
+        for kicker in descending:
+            if kicker not in (high, low):
+                paired[PRIMES[high] ** 2 * PRIMES[low] ** 2 * PRIMES[kicker]] = value
+                value += 1
+    for pair in descending:
+        kickers = [r for r in descending if r != pair]
+        for k1, k2, k3 in itertools.combinations(kickers, 3):
+            paired[PRIMES[pair] ** 2 * PRIMES[k1] * PRIMES[k2] * PRIMES[k3]] = value
+            value += 1
+    for mask in high_cards:
+        unique[mask] = value
+        value += 1
+    assert value - 1 == HAND_CLASSES[-1][0]
+
+    products = array('I', sorted(paired))
+    values = array('H', (paired[p] for p in products))
+    return flush, unique, products, values
+
+
+def _save_tables(path, tables):
+    """Writes the tables atomically; a read-only location is silently skipped."""
+    flush, unique, products, values = tables
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_TABLE_MAGIC)
+            f.write(len(products).to_bytes(4, "little"))
+            for table in tables:
+                table.tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _load_tables(path):
+    """Reads cached tables, or returns None if the file is missing or damaged."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(_TABLE_MAGIC)) != _TABLE_MAGIC:
+                return None
+            count = int.from_bytes(f.read(4), "little")
+            tables = (array('H'), array('H'), array('I'), array('H'))
+            for table, size in zip(tables, (8192, 8192, count, count)):
+                table.fromfile(f, size)
+    except (OSError, EOFError, ValueError):
         return None
+    return tables
+
+
+class HandEvaluator:
+    """
+    Table-driven five-card evaluator (Cactus Kev style, no sorting).
+
+    Each card packs its rank prime, rank bit and suit bit into one int.  AND
+    of the five words keeps a suit bit only for a flush, OR of the rank bits
+    is a 13-bit mask that indexes the flush/unique tables directly, and hands
+    with a repeated rank are found by their prime product (a dict for single
+    hands, a binary search over the sorted products for NumPy batches).
+    """
+
+    def __init__(self, tables=None):
+        self.flush, self.unique, self.products, self.values = tables or build_hand_tables()
+        self.paired = dict(zip(self.products, self.values))
+        self._np_tables = None
+
+    @classmethod
+    def load(cls, path=TABLE_CACHE):
+        """Loads the tables from the disk cache, building and saving them if needed."""
+        tables = _load_tables(path) if path else None
+        if tables is None:
+            tables = build_hand_tables()
+            if path:
+                _save_tables(path, tables)
+        return cls(tables)
+
+    def evaluate(self, c1, c2, c3, c4, c5):
+        """Returns the value (1 = best .. 7462 = worst) of five card codes."""
+        p1, p2, p3, p4, p5 = _PACKED[c1], _PACKED[c2], _PACKED[c3], _PACKED[c4], _PACKED[c5]
+        mask = (p1 | p2 | p3 | p4 | p5) >> 16
+        if p1 & p2 & p3 & p4 & p5 & 0xF000:
+            return self.flush[mask]
+        value = self.unique[mask]
+        if value:
+            return value
+        return self.paired[(p1 & 0xFF) * (p2 & 0xFF) * (p3 & 0xFF) * (p4 & 0xFF) * (p5 & 0xFF)]
+
+    def evaluate_hand(self, hand):
+        """Returns the value of a hand of five Card objects."""
+        return self.evaluate(*[card.code for card in hand])
+
+    def evaluate_batch(self, hands):
+        """
+        Evaluates an (n, 5) array of card codes at once.
+
+        Returns:
+            numpy.ndarray: The n hand values as uint16.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for batch evaluation.")
+        if self._np_tables is None:
+            self._np_tables = (np.array(_PACKED, dtype=np.int64), np.array(self.flush),
+                               np.array(self.unique), np.array(self.products, dtype=np.int64),
+                               np.array(self.values))
+        packed, flush, unique, products, values = self._np_tables
+        # one row per card position, so each reduction is a run of 1-D ops
+        w1, w2, w3, w4, w5 = packed[np.asarray(hands).T]
+        mask = (w1 | w2 | w3 | w4 | w5) >> 16
+        result = np.where(w1 & w2 & w3 & w4 & w5 & 0xF000, flush[mask], unique[mask])
+        paired = np.flatnonzero(result == 0)
+        if paired.size:
+            product = w1[paired] & 0xFF
+            for w in (w2, w3, w4, w5):
+                product *= w[paired] & 0xFF
+            result[paired] = values[np.searchsorted(products, product)]
+        return result
+
+
+def hand_class(value):
+    """Returns the name of the hand class ("Full House", ...) for a hand value."""
+    for worst, name in HAND_CLASSES:
+        if value <= worst:
+            return name
+    raise ValueError(f"invalid hand value: {value}")
+
+
+_evaluator = None
+
+
+def get_evaluator():
+    """Returns the shared HandEvaluator, loading the cached tables on first use."""
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = HandEvaluator.load()
+    return _evaluator
+
+
+def reference_rank(codes):
+    """
+    Slow, straightforward evaluator used to check the lookup tables.
+
+    Returns:
+        tuple: (category, tie-breaking ranks); a larger tuple is a better hand.
+    """
+    ranks = sorted((code % len(RANKS) for code in codes), reverse=True)
+    counts = {rank: ranks.count(rank) for rank in ranks}
+    by_count = sorted(counts, key=lambda rank: (counts[rank], rank), reverse=True)
+    shape = sorted(counts.values(), reverse=True)
+    flush = len({code // len(RANKS) for code in codes}) == 1
+    straight_high = None
+    if len(counts) == 5:
+        if ranks[0] - ranks[4] == 4:
+            straight_high = ranks[0]
+        elif ranks == [12, 3, 2, 1, 0]:
+            straight_high = 3  # the wheel plays as 5-high
+    if straight_high is not None:
+        return (8 if flush else 4, (straight_high,))
+    if shape == [4, 1]:
+        return 7, tuple(by_count)
+    if shape == [3, 2]:
+        return 6, tuple(by_count)
+    if flush:
+        return 5, tuple(ranks)
+    if shape == [3, 1, 1]:
+        return 3, tuple(by_count)
+    if shape == [2, 2, 1]:
+        return 2, tuple(by_count)
+    if shape == [2, 1, 1, 1]:
+        return 1, tuple(by_count)
+    return 0, tuple(ranks)
+
+
+def validate_evaluator(evaluator=None):
+    """
+    Checks the evaluator against reference_rank over all C(52, 5) hands.
+
+    The two must order every pair of hands the same way: each reference rank
+    maps to exactly one value, the 7462 values are all used, and better
+    reference ranks get smaller values.  The batch path must match the scalar
+    one.  Returns True when everything agrees.
+    """
+    evaluator = evaluator or get_evaluator()
+    seen = {}
+    evaluate = evaluator.evaluate
+    hands = itertools.combinations(range(DECK_SIZE), 5)
+    scalar = array('H', (evaluate(*hand) for hand in hands))
+    for hand, value in zip(itertools.combinations(range(DECK_SIZE), 5), scalar):
+        key = reference_rank(hand)
+        if seen.setdefault(key, value) != value:
+            print(f"Mismatch: {[card_name(c) for c in hand]} -> {value}, expected {seen[key]}")
+            return False
+    ordered = [seen[key] for key in sorted(seen, reverse=True)]
+    ok = ordered == list(range(1, HAND_CLASSES[-1][0] + 1))
+    print(f"{len(scalar):,} hands, {len(seen):,} classes, ordering "
+          f"{'matches' if ok else 'DIFFERS FROM'} the reference")
+    if np is not None:
+        all_hands = np.array(list(itertools.combinations(range(DECK_SIZE), 5)), dtype=np.int8)
+        batch_ok = np.array_equal(evaluator.evaluate_batch(all_hands), np.array(scalar))
+        print(f"Batch evaluation {'matches' if batch_ok else 'DIFFERS FROM'} scalar evaluation")
+        ok = ok and batch_ok
+    return ok
+
+
+# --------------------------------------------------------------------------- #
+# Draw-strategy simulation
+# --------------------------------------------------------------------------- #
+# Every replacement strategy: the (1-based, sorted) positions to discard
+STRATEGIES = [tuple(pos for pos in range(1, 6) if mask >> (pos - 1) & 1) for mask in range(32)]
+SIM_BATCH = 100_000  # deals simulated per process-pool task
+
+
+def replace_cards(hand, positions, deal):
+    """Replaces the cards at the given 1-based positions, in order, with deal()."""
+    for pos in positions:
+        # Adjust for 0-based index
+        hand[pos - 1] = deal()
+    return hand
+
+
+def _strategy_gathers():
+    """
+    Returns a (32, 5) index array into the first ten cards dealt from a deck.
+
+    Running replace_cards on the positions 0..4 with cards 5, 6, ... as the
+    replacements records where every final card of every strategy comes from.
+    """
+    rows = []
+    for positions in STRATEGIES:
+        replacements = iter(range(5, 10))
+        rows.append(replace_cards(list(range(5)), positions, replacements.__next__))
+    return np.array(rows, dtype=np.intp)
+
+
+def _simulate_chunk(deals, seed):
+    """Worker: play deals hands under every strategy; return a (32, 9) histogram."""
+    evaluator = get_evaluator()
+    gathers = _strategy_gathers()
+    class_bounds = np.array([worst for worst, _ in HAND_CLASSES])
+    decks = DeckBatch(deals, np.random.default_rng(seed))
+    decks.shuffle()
+    dealt = np.ascontiguousarray(decks.deal(10))  # 5 for the hand, up to 5 replacements
+    histogram = np.zeros((len(STRATEGIES), len(HAND_CLASSES)), dtype=np.int64)
+    for strategy, gather in enumerate(gathers):
+        values = evaluator.evaluate_batch(dealt[:, gather])
+        classes = np.searchsorted(class_bounds, values)
+        histogram[strategy] = np.bincount(classes, minlength=len(HAND_CLASSES))
+    return histogram
+
+
+def simulate_strategies(deals, seed=None, workers=None, batch_size=SIM_BATCH):
+    """
+    Estimates the final-hand distribution of every discard strategy.
+
+    Each deal of five cards is played 32 ways, replacing the discarded
+    positions from the rest of the same deck exactly as play_poker does.
+    Deals are split into batches of batch_size, each with its own child of
+    SeedSequence(seed), so results do not depend on the worker count.  Only
+    the per-strategy histograms are returned, never the hands.
+
+    Returns:
+        numpy.ndarray: (32, 9) counts of hand classes (HAND_CLASSES order),
+        one row per entry of STRATEGIES.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the strategy simulator.")
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    sizes = [min(batch_size, deals - start) for start in range(0, deals, batch_size)]
+    jobs = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    histogram = np.zeros((len(STRATEGIES), len(HAND_CLASSES)), dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for size, child in jobs:
+            histogram += _simulate_chunk(size, child)
+        return histogram
+
+    get_evaluator()  # load the tables once so forked workers inherit them
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for size, child in jobs:
+            pending.append(pool.submit(_simulate_chunk, size, child))
+            if len(pending) >= 2 * workers:
+                histogram += pending.popleft().result()
+        while pending:
+            histogram += pending.popleft().result()
+    return histogram
+
+
+def display_strategies(histogram):
+    """Prints every strategy's hand-class percentages."""
+    deals = histogram[0].sum()
+    short = ["SF", "4K", "FH", "Fl", "St", "3K", "2P", "1P", "HC"]
+    print(f"\n{'discard':10}" + "".join(f"{name:>7}" for name in short))
+    for strategy in range(len(STRATEGIES)):
+        label = ",".join(map(str, STRATEGIES[strategy])) or "none"
+        shares = histogram[strategy] / deals * 100
+        print(f"{label:10}" + "".join(f"{share:7.3f}" for share in shares))
 
 
 def display_hand(hand, message="Your hand:"):
@@ -66,13 +682,145 @@ def play_poker():
     positions = sorted(set(positions))
 
     # Replace the selected cards with new ones from the deck
-    for pos in positions:
-        # Adjust for 0-based index
-        hand[pos - 1] = deck.deal_card()
+    replace_cards(hand, positions, deck.deal_card)
 
     # Display the new hand after drawing replacements
     display_hand(hand, "Your new hand:")
+    print(f"You have: {hand_class(get_evaluator().evaluate_hand(hand))}")
 
 
-if __name__ == "__main__":
+class _LegacyCard:
+    """The original card object, kept as the benchmark baseline."""
+
+    def __init__(self, suit, rank):
+        self.suit = suit
+        self.rank = rank
+
+
+def _legacy_deck():
+    return [_LegacyCard(suit, rank) for suit in SUITS for rank in RANKS]
+
+
+def benchmark(decks=100_000, batch=100_000):
+    """Compares creating, shuffling and dealing 5-card hands per representation."""
+
+    def rate(label, func, count):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:42} {count / elapsed:14,.0f} /s")
+
+    print(f"\nBenchmark ({decks:,} decks, batches of {batch:,}):")
+    rate("create: object deck (original)", lambda: [_legacy_deck() for _ in range(decks)], decks)
+    rate("create: Deck (interned view)", lambda: [Deck() for _ in range(decks)], decks)
+    rate("create: CompactDeck", lambda: [CompactDeck() for _ in range(decks)], decks)
+
+    legacy = _legacy_deck()
+    rate("shuffle: object deck (original)", lambda: [random.shuffle(legacy) for _ in range(decks)], decks)
+    compact = CompactDeck()
+    rate("shuffle: CompactDeck", lambda: [compact.shuffle() for _ in range(decks)], decks)
+
+    def deal_legacy():
+        for _ in range(decks):
+            cards = list(legacy)
+            [cards.pop() for _ in range(5)]
+
+    def deal_compact():
+        for _ in range(decks):
+            compact.reset()
+            compact.deal_many(5)
+
+    def deal_random():
+        deal = compact.deal_random
+        for _ in range(decks):
+            compact.reset()
+            deal(), deal(), deal(), deal(), deal()
+
+    rate("deal 5: object deck (original)", deal_legacy, decks)
+    rate("deal 5: CompactDeck", deal_compact, decks)
+    rate("reset + 5 x deal_random (no shuffle)", deal_random, decks)
+
+    if np is not None:
+        batches = DeckBatch(batch, np.random.default_rng(0))
+        rate("create: DeckBatch (per deck)", lambda: DeckBatch(batch), batch)
+        rate("shuffle: DeckBatch (per deck)", batches.shuffle, batch)
+        rate("deal 5: DeckBatch (per deck)", lambda: batches.deal(5).copy(), batch)
+
+
+def benchmark_evaluator(hands=1_000_000):
+    """Times table build vs. cache load and scalar vs. batch evaluation."""
+    start = time.perf_counter()
+    tables = build_hand_tables()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluator = HandEvaluator.load()
+    loaded = time.perf_counter() - start
+    print(f"\nTables: built in {built * 1000:.1f} ms, loaded from cache in {loaded * 1000:.1f} ms")
+    del tables
+
+    rng = random.Random(0)
+    sample = [rng.sample(range(DECK_SIZE), 5) for _ in range(hands)]
+    evaluate = evaluator.evaluate
+    start = time.perf_counter()
+    for hand in sample:
+        evaluate(*hand)
+    elapsed = time.perf_counter() - start
+    print(f"{'evaluate (scalar)':24} {hands / elapsed:14,.0f} hands/s")
+
+    start = time.perf_counter()
+    for hand in sample:
+        reference_rank(hand)
+    elapsed = time.perf_counter() - start
+    print(f"{'reference_rank':24} {hands / elapsed:14,.0f} hands/s")
+
+    if np is not None:
+        batch = DeckBatch(hands, np.random.default_rng(0))
+        batch.shuffle()
+        dealt = batch.deal(5)
+        evaluator.evaluate_batch(dealt[:10])  # build the NumPy tables outside the timing
+        start = time.perf_counter()
+        evaluator.evaluate_batch(dealt)
+        elapsed = time.perf_counter() - start
+        print(f"{'evaluate_batch (NumPy)':24} {hands / elapsed:14,.0f} hands/s")
+
+
+def cli():
+    """
+    Command-line entry point. Without arguments the interactive game runs.
+    """
+    parser = argparse.ArgumentParser(description="Five-card draw hand replacement")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="benchmark deck creation, shuffling and dealing")
+    parser.add_argument("--decks", type=int, default=100_000, help="decks per benchmark run")
+    parser.add_argument("--benchmark-eval", action="store_true",
+                        help="benchmark the lookup-table hand evaluator")
+    parser.add_argument("--validate", action="store_true",
+                        help="check the evaluator against the reference over all 2,598,960 hands")
+    parser.add_argument("--simulate", type=int, metavar="DEALS",
+                        help="simulate DEALS deals under all 32 discard strategies")
+    parser.add_argument("--seed", type=int, help="random seed for --simulate")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes for --simulate")
+    args = parser.parse_args()
+
+    if args.simulate:
+        start = time.perf_counter()
+        histogram = simulate_strategies(args.simulate, args.seed, args.workers)
+        elapsed = time.perf_counter() - start
+        display_strategies(histogram)
+        print(f"\n{args.simulate:,} deals x {len(STRATEGIES)} strategies in {elapsed:.1f} s: "
+              f"{args.simulate / elapsed:,.0f} deals/s, "
+              f"{args.simulate * len(STRATEGIES) / elapsed:,.0f} hands/s")
+        return
+    if args.validate:
+        raise SystemExit(0 if validate_evaluator() else 1)
+    if args.benchmark or args.benchmark_eval:
+        if args.benchmark:
+            benchmark(args.decks, args.decks)
+        if args.benchmark_eval:
+            benchmark_evaluator()
+        return
     play_poker()
+
+
+if __name__ == "__main__":
+    cli()
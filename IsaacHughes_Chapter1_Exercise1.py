@@ -2,9 +2,412 @@
 # This program allows users to pre-purchase cinema tickets with a maximum of 20 tickets available.
 # Each buyer can buy up to 4 tickets. The program displays the remaining tickets after each purchase
 # and tracks the total number of buyers.
+#
+# TicketEngine applies the same rules to many shows and many simultaneous buyers; run with
+# --load-test to hammer it from threads or asyncio tasks and check that nothing is oversold.
+# TicketLedger makes sales durable with an append-only, group-committed log plus snapshots;
+# pass --ledger DIR to keep the pre-sale across restarts.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
 
 # Constant for the total number of tickets
 TOTAL_TICKETS = 20
+# Constant for the most tickets one buyer may hold for a show
+MAX_PER_BUYER = 4
+# Committed ledger records between automatic snapshots
+SNAPSHOT_EVERY = 100_000
+
+
+class Reservation(NamedTuple):
+    """Outcome of one reservation attempt."""
+    accepted: bool
+    tickets: int     # tickets granted (0 if refused)
+    remaining: int   # tickets left for the show afterwards
+    reason: str      # "ok", "sold out", "not enough tickets", "buyer limit",
+                     # "invalid quantity" or "unknown show"
+
+
+class ShowInventory:
+    """
+    Ticket inventory for one show. All state changes happen under the show's own lock,
+    so shows never contend with each other and each reservation is a few dict operations.
+    """
+
+    __slots__ = ("total", "remaining", "held", "lock")
+
+    def __init__(self, total=TOTAL_TICKETS):
+        self.total = total
+        self.remaining = total
+        self.held = {}  # buyer id -> tickets bought for this show
+        self.lock = threading.Lock()
+
+    @property
+    def buyers(self):
+        """Number of distinct buyers holding tickets."""
+        return len(self.held)
+
+    def reserve(self, buyer, tickets):
+        """
+        Reserves tickets for a buyer unless that would oversell the show or take the
+        buyer past MAX_PER_BUYER. The whole check-and-update runs under the lock.
+        """
+        if not 1 <= tickets <= MAX_PER_BUYER:
+            return Reservation(False, 0, self.remaining, "invalid quantity")
+        with self.lock:
+            remaining = self.remaining
+            if remaining == 0:
+                return Reservation(False, 0, 0, "sold out")
+            if tickets > remaining:
+                return Reservation(False, 0, remaining, "not enough tickets")
+            already = self.held.get(buyer, 0)
+            if already + tickets > MAX_PER_BUYER:
+                return Reservation(False, 0, remaining, "buyer limit")
+            self.held[buyer] = already + tickets
+            self.remaining = remaining - tickets
+            return Reservation(True, tickets, remaining - tickets, "ok")
+
+    def apply(self, buyer, tickets):
+        """Records an already-validated purchase (used when replaying a ledger)."""
+        with self.lock:
+            self.held[buyer] = self.held.get(buyer, 0) + tickets
+            self.remaining -= tickets
+
+    def release(self, buyer, tickets):
+        """Gives back tickets from an accepted reservation (used when it could not be logged)."""
+        with self.lock:
+            left = self.held.get(buyer, 0) - tickets
+            if left > 0:
+                self.held[buyer] = left
+            else:
+                self.held.pop(buyer, None)
+            self.remaining += tickets
+
+
+class TicketEngine:
+    """
+    Thread-safe and asyncio-friendly ticket inventory for many shows.
+
+    reserve() may be called from any number of threads; reserve_async() from asyncio
+    tasks. The critical section is a few microseconds and never awaits, so the async
+    API calls it directly instead of hopping to a thread pool.
+    """
+
+    def __init__(self, shows=(), total_tickets=TOTAL_TICKETS):
+        self.shows = {}
+        self._shows_lock = threading.Lock()  # only taken to add shows
+        for show in shows:
+            self.add_show(show, total_tickets)
+
+    def add_show(self, show, total_tickets=TOTAL_TICKETS):
+        """Adds a show with its own inventory (an existing show is left as it is)."""
+        with self._shows_lock:
+            return self.shows.setdefault(show, ShowInventory(total_tickets))
+
+    def reserve(self, show, buyer, tickets):
+        """Tries to reserve tickets for buyer at show; returns a Reservation."""
+        inventory = self.shows.get(show)
+        if inventory is None:
+            return Reservation(False, 0, 0, "unknown show")
+        return inventory.reserve(buyer, tickets)
+
+    async def reserve_async(self, show, buyer, tickets):
+        """Coroutine version of reserve()."""
+        return self.reserve(show, buyer, tickets)
+
+    def status(self, show):
+        """Returns (remaining tickets, number of buyers) for a show."""
+        inventory = self.shows[show]
+        with inventory.lock:
+            return inventory.remaining, inventory.buyers
+
+    def check_invariants(self):
+        """
+        Checks every show: nothing oversold, sold + remaining == total, and no buyer over
+        MAX_PER_BUYER. Returns a list of problems (empty when all is well).
+        """
+        problems = []
+        for show, inventory in self.shows.items():
+            with inventory.lock:
+                sold = sum(inventory.held.values())
+                if inventory.remaining < 0 or sold + inventory.remaining != inventory.total:
+                    problems.append(f"{show}: sold {sold} + remaining {inventory.remaining} "
+                                    f"!= total {inventory.total}")
+                over = [buyer for buyer, held in inventory.held.items()
+                        if not 1 <= held <= MAX_PER_BUYER]
+                if over:
+                    problems.append(f"{show}: {len(over)} buyers outside 1..{MAX_PER_BUYER} tickets")
+        return problems
+
+
+class TicketLedger:
+    """
+    Durable ticket sales: a TicketEngine whose accepted reservations are written to an
+    append-only log before reserve() returns.
+
+    Concurrent purchases are group-committed: buyers add their record to the pending
+    batch and wait on that batch's future while a single writer thread appends the whole
+    batch and fsyncs once, so one disk flush covers every sale that arrived during the
+    previous one. If a commit fails the reservation is released again and the error
+    is raised to the buyer. snapshot() folds the finished log segments into
+    snapshot.json and deletes them; it runs in the background every snapshot_every
+    committed records and on close() (snapshot_every=None leaves snapshots to the
+    caller). Opening a ledger loads the snapshot and replays only the log tail.
+    Refused reservations change nothing and are not logged.
+    """
+
+    SNAPSHOT = "snapshot.json"
+
+    def __init__(self, directory, group_commit=True, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.group_commit = group_commit
+        self.snapshot_every = snapshot_every
+        self.engine = TicketEngine()
+        self.records_replayed = 0
+        os.makedirs(directory, exist_ok=True)
+        self._segment = self._recover()
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._file_lock = threading.Lock()  # held while writing/fsyncing or rotating
+        self._snapshot_lock = threading.Lock()  # one snapshot at a time
+        self._add_lock = threading.Lock()  # orders show records before their sales
+        self._since_snapshot = 0  # records committed since the last snapshot
+        self._cond = threading.Condition()
+        self._pending = []
+        self._batch = Future()
+        self._closed = False
+        self.commits = 0
+        self.committed_records = 0
+        self._writer = threading.Thread(target=self._write_batches, daemon=True)
+        if group_commit:
+            self._writer.start()
+
+    # -- files and recovery -------------------------------------------------
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"log.{segment:06d}")
+
+    def _segments(self):
+        return sorted(int(name[4:]) for name in os.listdir(self.directory)
+                      if name.startswith("log.") and name[4:].isdigit())
+
+    @staticmethod
+    def _replay(path, engine, waiting, truncate_torn=False):
+        """
+        Applies every complete record in a log segment; returns the record count.
+        Sales of a show whose record has not been seen yet are kept in waiting
+        (show -> [(buyer, tickets)]) until it turns up.
+        """
+        count = 0
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    break  # torn write from a crash: everything after it is lost
+                if record[0] == "show":
+                    inventory = engine.add_show(record[1], record[2])
+                    for buyer, tickets in waiting.pop(record[1], ()):
+                        inventory.apply(buyer, tickets)
+                elif record[1] in engine.shows:
+                    engine.shows[record[1]].apply(record[2], record[3])
+                else:
+                    waiting.setdefault(record[1], []).append((record[2], record[3]))
+                count += 1
+                good += len(line)
+        if truncate_torn and good != os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good)
+        return count
+
+    def _load_snapshot(self, engine):
+        """Loads snapshot.json into engine; returns the first log segment it does not cover."""
+        try:
+            with open(os.path.join(self.directory, self.SNAPSHOT), encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 1
+        for show, total, buyers, tickets in snapshot["shows"]:
+            inventory = engine.add_show(show, total)
+            inventory.held = dict(zip(buyers, tickets))
+            inventory.remaining = total - sum(tickets)
+        return snapshot["next_segment"]
+
+    def _replay_segments(self, engine, segments, truncate_torn=False):
+        """Replays log segments in order; returns the record count."""
+        waiting = {}
+        count = 0
+        for segment in segments:
+            count += self._replay(self._segment_path(segment), engine, waiting,
+                                  truncate_torn and segment == segments[-1])
+        for show, sales in waiting.items():
+            # the show record was lost (older ledgers could log a sale first)
+            inventory = engine.add_show(show)
+            for buyer, tickets in sales:
+                inventory.apply(buyer, tickets)
+        return count
+
+    def _recover(self):
+        """Rebuilds the engine from the snapshot plus the log tail; returns the segment to append to."""
+        first = self._load_snapshot(self.engine)
+        segments = [segment for segment in self._segments() if segment >= first]
+        self.records_replayed += self._replay_segments(self.engine, segments, truncate_torn=True)
+        return segments[-1] if segments else first
+
+    # -- commits ------------------------------------------------------------
+    def _commit(self, record):
+        """Makes one record durable; returns once it is on disk."""
+        data = (json.dumps(record) + "\n").encode()
+        if not self.group_commit:
+            with self._file_lock:
+                self._write(data)
+                self.commits += 1
+                self.committed_records += 1
+                self._count_for_snapshot(1)
+            return None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ledger is closed")
+            self._pending.append(data)
+            batch = self._batch
+            self._cond.notify()
+        return batch
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write_batches(self):
+        """Writer thread: one write and one fsync per batch of waiting records."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                records, batch = self._pending, self._batch
+                self._pending, self._batch = [], Future()
+            try:
+                with self._file_lock:
+                    self._write(b"".join(records))
+                    self._count_for_snapshot(len(records))
+                self.commits += 1
+                self.committed_records += len(records)
+                batch.set_result(None)
+            except OSError as exc:
+                batch.set_exception(exc)
+
+    def _count_for_snapshot(self, records):
+        """
+        Starts a background snapshot once snapshot_every records have been committed.
+        Called with _file_lock held.
+        """
+        self._since_snapshot += records
+        if (self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every
+                and self._snapshot_lock.acquire(blocking=False)):
+            threading.Thread(target=self._background_snapshot, daemon=True).start()
+
+    def _background_snapshot(self):
+        try:
+            self._snapshot()
+        finally:
+            self._snapshot_lock.release()
+
+    def add_show(self, show, total_tickets=TOTAL_TICKETS):
+        """Adds (and logs) a show; an existing show is left as it is."""
+        with self._add_lock:
+            if show in self.engine.shows:
+                return
+            # queue the show record before the show can take sales, so it is logged first
+            batch = self._commit(["show", show, total_tickets])
+            self.engine.add_show(show, total_tickets)
+        if batch is not None:
+            batch.result()
+
+    def reserve(self, show, buyer, tickets):
+        """Like TicketEngine.reserve(), but an accepted reservation is durable on return."""
+        outcome = self.engine.reserve(show, buyer, tickets)
+        if outcome.accepted:
+            try:
+                batch = self._commit(["buy", show, buyer, tickets])
+                if batch is not None:
+                    batch.result()
+            except Exception:
+                self.engine.shows[show].release(buyer, tickets)
+                raise
+        return outcome
+
+    async def reserve_async(self, show, buyer, tickets):
+        """Coroutine version of reserve(); waits for the group commit without blocking the loop."""
+        outcome = self.engine.reserve(show, buyer, tickets)
+        if outcome.accepted:
+            try:
+                batch = self._commit(["buy", show, buyer, tickets])
+                if batch is not None:
+                    await asyncio.wrap_future(batch)
+            except Exception:
+                self.engine.shows[show].release(buyer, tickets)
+                raise
+        return outcome
+
+    # -- snapshots ----------------------------------------------------------
+    def snapshot(self):
+        """
+        Starts a new log segment, folds the finished segments into snapshot.json and
+        deletes them. Reads only what is already on disk, so sales continue meanwhile.
+        """
+        with self._snapshot_lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        with self._file_lock:
+            self._file.close()
+            finished = self._segment
+            self._segment += 1
+            self._file = open(self._segment_path(self._segment), "ab")
+            self._since_snapshot = 0
+
+        state = TicketEngine()
+        first = self._load_snapshot(state)
+        old = [segment for segment in self._segments() if first <= segment <= finished]
+        self._replay_segments(state, old)
+        snapshot = {
+            "next_segment": finished + 1,
+            "shows": [[show, inv.total, list(inv.held), list(inv.held.values())]
+                      for show, inv in state.shows.items()],
+        }
+        path = os.path.join(self.directory, self.SNAPSHOT)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        for segment in old:
+            os.remove(self._segment_path(segment))
+
+    def close(self):
+        """Commits anything pending, snapshots new sales (unless snapshot_every is None) and closes the log."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self.group_commit:
+            self._writer.join()
+        with self._snapshot_lock:  # also waits for a background snapshot
+            if self.snapshot_every is not None and self._since_snapshot:
+                self._snapshot()
+        with self._file_lock:
+            self._file.close()
 
 
 def get_ticket_request(remaining_tickets):
@@ -28,20 +431,27 @@ def get_ticket_request(remaining_tickets):
             print("Invalid input. Please enter a whole number between 1 and 4.")
 
 
-def ticket_sales():
+def ticket_sales(ledger_dir=None):
     """
     Handles the ticket sale process, displaying the number of tickets remaining
-    and counting the number of buyers.
+    and counting the number of buyers. With a ledger directory, sales are saved as
+    they happen and an interrupted pre-sale resumes where it stopped.
     """
-    remaining_tickets = TOTAL_TICKETS
-    total_buyers = 0
+    if ledger_dir:
+        engine = TicketLedger(ledger_dir)
+        engine.add_show("main")
+    else:
+        engine = TicketEngine(["main"])
+    shows = engine.engine.shows if ledger_dir else engine.shows
+    remaining_tickets = shows["main"].remaining
+    total_buyers = shows["main"].buyers
 
     while remaining_tickets > 0:
         # Get the number of tickets requested by the buyer
         tickets_requested = get_ticket_request(remaining_tickets)
 
-        # Update the number of remaining tickets
-        remaining_tickets -= tickets_requested
+        # Reserve the tickets and update the number of remaining tickets
+        remaining_tickets = engine.reserve("main", total_buyers, tickets_requested).remaining
 
         # Increment the total number of buyers
         total_buyers += 1
@@ -51,9 +461,175 @@ def ticket_sales():
 
     # Display the total number of buyers
     print(f"All tickets have been sold! Total buyers: {total_buyers}.")
+    if ledger_dir:
+        engine.close()
+
+
+def _buyer_requests(seed, shows, buyers, attempts):
+    """Random (show, buyer, tickets) requests; a few ask for an invalid quantity."""
+    rng = random.Random(seed)
+    return [(rng.randrange(shows), rng.randrange(buyers), rng.choice((1, 1, 2, 2, 3, 4, 5)))
+            for _ in range(attempts)]
+
+
+def _report(label, engine, outcomes, elapsed):
+    """Prints throughput and checks the engine's invariants against the outcomes."""
+    accepted = [outcome for outcome in outcomes if outcome.accepted]
+    sold = sum(outcome.tickets for outcome in accepted)
+    problems = engine.check_invariants()
+    sold_by_engine = sum(inv.total - inv.remaining for inv in engine.shows.values())
+    if sold != sold_by_engine:
+        problems.append(f"granted {sold} tickets but the shows sold {sold_by_engine}")
+    print(f"{label:8} {len(outcomes):>10,} attempts in {elapsed:6.2f} s: "
+          f"{len(outcomes) / elapsed:12,.0f} reservations/s, {len(accepted):,} accepted, "
+          f"{sold:,} tickets sold, {sum(inv.buyers for inv in engine.shows.values()):,} buyers")
+    for problem in problems[:10]:
+        print("  INVARIANT VIOLATED:", problem)
+    return not problems
+
+
+def load_test(shows=100, tickets=TOTAL_TICKETS, buyers=10_000, threads=8,
+              tasks=1_000, attempts=200_000, seed=0):
+    """
+    Hammers fresh engines with random requests from threads and from asyncio tasks.
+
+    Few shows with many tickets means heavy contention on each show's lock; the
+    default leaves most shows sold out early, so refusals are exercised too.
+    Returns True when every invariant holds.
+    """
+    print(f"Load test: {shows:,} shows x {tickets:,} tickets, {buyers:,} buyers, "
+          f"{attempts:,} attempts")
+    ok = True
+
+    # Threads
+    engine = TicketEngine(range(shows), tickets)
+    per_thread = [_buyer_requests(f"{seed}-thread-{i}", shows, buyers, attempts // threads)
+                  for i in range(threads)]
+    results = [None] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        reserve = engine.reserve
+        requests = per_thread[index]
+        barrier.wait()
+        results[index] = [reserve(*request) for request in requests]
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ok &= _report(f"{threads} thr", engine, [r for chunk in results for r in chunk], elapsed)
+
+    # asyncio tasks
+    engine = TicketEngine(range(shows), tickets)
+    per_task = [_buyer_requests(f"{seed}-task-{i}", shows, buyers, attempts // tasks)
+                for i in range(tasks)]
+
+    async def client(requests):
+        outcomes = []
+        for request in requests:
+            outcomes.append(await engine.reserve_async(*request))
+            await asyncio.sleep(0)  # let other buyers interleave
+        return outcomes
+
+    async def run_clients():
+        return await asyncio.gather(*(client(requests) for requests in per_task))
+
+    start = time.perf_counter()
+    chunks = asyncio.run(run_clients())
+    elapsed = time.perf_counter() - start
+    ok &= _report(f"{tasks} aio", engine, [r for chunk in chunks for r in chunk], elapsed)
+    return ok
+
+
+def benchmark_ledger(threads=32, purchases=20_000, sizes=(10_000, 100_000, 1_000_000)):
+    """
+    Purchases/second with one fsync per sale vs. group commit, then recovery time for
+    ledgers of several sizes, replaying the full log vs. loading a snapshot + short tail.
+    """
+    base = tempfile.mkdtemp(prefix="ledger-bench-")
+    try:
+        print(f"Durable purchases ({threads} buyer threads):")
+        for label, group_commit in (("fsync per sale", False), ("group commit", True)):
+            ledger = TicketLedger(os.path.join(base, label.replace(" ", "-")), group_commit)
+            ledger.add_show("main", 10 ** 9)
+            per_thread = purchases // threads
+
+            def buyer(index):
+                for i in range(per_thread):
+                    ledger.reserve("main", index * per_thread + i, 1)
+
+            pool = [threading.Thread(target=buyer, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            ledger.close()
+            print(f"  {label:15} {per_thread * threads / elapsed:10,.0f} purchases/s, "
+                  f"{ledger.committed_records / ledger.commits:6.1f} sales per fsync")
+
+        print("Recovery (open a ledger):")
+        for size in sizes:
+            directory = os.path.join(base, f"recover-{size}")
+            os.makedirs(directory)
+            with open(os.path.join(directory, "log.000001"), "w", encoding="utf-8") as f:
+                f.write(json.dumps(["show", "main", 10 ** 9]) + "\n")
+                f.writelines(json.dumps(["buy", "main", i, 1]) + "\n" for i in range(size))
+            start = time.perf_counter()
+            TicketLedger(directory).close()
+            full = time.perf_counter() - start
+
+            ledger = TicketLedger(directory, snapshot_every=None)
+            ledger.snapshot()
+            for i in range(1_000):
+                ledger.reserve("main", size + i, 1)
+            ledger.close()
+            start = time.perf_counter()
+            recovered = TicketLedger(directory)
+            tail = time.perf_counter() - start
+            recovered.close()
+            print(f"  {size:>10,} sales: full replay {full * 1000:8.1f} ms, "
+                  f"snapshot + 1,000-record tail {tail * 1000:8.1f} ms "
+                  f"({recovered.records_replayed:,} records replayed)")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def cli():
+    """
+    Command-line entry point. Without arguments the interactive pre-sale runs.
+    """
+    parser = argparse.ArgumentParser(description="Cinema ticket pre-sale")
+    parser.add_argument("--load-test", action="store_true",
+                        help="hammer the ticket engine and check its invariants")
+    parser.add_argument("--shows", type=int, default=100, help="shows in the load test")
+    parser.add_argument("--tickets", type=int, default=TOTAL_TICKETS, help="tickets per show")
+    parser.add_argument("--buyers", type=int, default=10_000, help="distinct buyers")
+    parser.add_argument("--threads", type=int, default=8, help="buyer threads")
+    parser.add_argument("--tasks", type=int, default=1_000, help="buyer asyncio tasks")
+    parser.add_argument("--attempts", type=int, default=200_000, help="reservation attempts")
+    parser.add_argument("--ledger", metavar="DIR", help="keep the pre-sale in a durable ledger")
+    parser.add_argument("--benchmark-ledger", action="store_true",
+                        help="benchmark durable purchases and ledger recovery")
+    args = parser.parse_args()
+
+    if args.benchmark_ledger:
+        benchmark_ledger()
+        return
+
+    if args.load_test:
+        ok = load_test(args.shows, args.tickets, args.buyers, args.threads, args.tasks,
+                       args.attempts)
+        raise SystemExit(0 if ok else 1)
+    ticket_sales(args.ledger)
 
 
 # Run the ticket sales process
 if __name__ == "__main__":
-    ticket_sales()
-
+    cli()
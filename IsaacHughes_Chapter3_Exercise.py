@@ -1,4 +1,19 @@
-from functools import reduce
+import argparse
+import csv
+import itertools
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, reduce
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the columnar fast path
+    np = None
 
 
 def get_expenses():
@@ -56,6 +71,323 @@ def analyze_expenses(expenses):
     return total, highest_expense, lowest_expense
 
 
+def read_ledger(filename, type_column=0, amount_column=1):
+    """
+    Lazily reads expenses from a CSV ledger, one row at a time.
+
+    Args:
+        filename (str): Path to the CSV file.
+        type_column (int): Index of the column holding the expense type.
+        amount_column (int): Index of the column holding the expense amount.
+
+    Yields:
+        tuple: (expense_type, expense_amount) for each row with a numeric amount.
+               Rows whose amount is not numeric (such as a header row) are skipped.
+    """
+    with open(filename, newline="", encoding="utf-8") as ledger:
+        for row in csv.reader(ledger):
+            try:
+                yield row[type_column], float(row[amount_column])
+            except (ValueError, IndexError):
+                continue
+
+
+_amount = itemgetter(1)
+# Rows buffered per category before their amounts are folded into exact partials
+_FOLD_ROWS = 65_536
+
+
+def _fold(partials, amounts):
+    """
+    Returns a short list of floats whose exact sum is the exact sum of partials
+    and amounts, the correctly rounded total first.
+
+    Each math.fsum pass rounds what is left of the exact sum, so a few C-level
+    passes capture it completely. If the sum overflows (or adds inf and -inf)
+    the result is the plain float sum, inf or nan, as with sum().
+    """
+    values = partials + amounts
+    try:
+        folded = [math.fsum(values)]
+    except (OverflowError, ValueError):
+        return [sum(values)]
+    if math.isfinite(folded[0]):
+        while True:
+            values.append(-folded[-1])
+            residual = math.fsum(values)
+            if not residual:
+                break
+            folded.append(residual)
+    return folded
+
+
+def _rounded_sum(partials):
+    """Correctly rounded sum of exact partials (inf or nan once they are not finite)."""
+    try:
+        return math.fsum(partials)
+    except (OverflowError, ValueError):
+        return sum(partials)
+
+
+class ExpenseSummary:
+    """
+    Mergeable partial result of an expense analysis.
+
+    Records the total, the number of expenses, the highest and lowest expense
+    and per-category totals and counts. Summaries of separate ledgers (for
+    example, one per worker process) can be combined with merge, and the class
+    is plain data so it pickles across processes.
+
+    Rows are taken a chunk at a time: max/min find the highest and lowest
+    expense and each category's amounts are gathered and summed at once. Float
+    sums depend on how the expenses were grouped, so a merged total can differ
+    from a serial run in the last bits. With exact=True each category's amounts
+    are instead folded with math.fsum into a few float partials holding their
+    exact sum, rounded once when read, so the totals do not depend on how the
+    expenses were split up or merged (at some cost in speed). Either way a sum
+    that overflows becomes inf (or nan), as a plain float sum does.
+    """
+
+    def __init__(self, exact=False):
+        self.exact = exact
+        self.total = 0
+        self.count = 0
+        self.highest = None
+        self.lowest = None
+        self.category_totals = {}
+        self.category_counts = {}
+        self._partials = {}  # expense type -> floats whose exact sum is its total
+
+    def update(self, expenses):
+        """
+        Adds every expense from an iterable in a single pass.
+
+        Args:
+            expenses (iterable): Expense tuples (expense_type, expense_amount).
+
+        Returns:
+            ExpenseSummary: This summary, to allow chaining.
+        """
+        total = self.total
+        count = self.count
+        highest = self.highest
+        lowest = self.lowest
+        exact = self.exact
+        partials = self._partials
+        category_totals = self.category_totals
+        category_counts = self.category_counts
+
+        expenses = iter(expenses)
+        while True:
+            chunk = list(itertools.islice(expenses, _FOLD_ROWS))
+            if not chunk:
+                break
+            # max/min keep the first of several equal amounts, like reduce does,
+            # and so do the strict comparisons with the earlier chunks.
+            chunk_high = max(chunk, key=_amount)
+            chunk_low = min(chunk, key=_amount)
+            if highest is None or chunk_high[1] > highest[1]:
+                highest = chunk_high
+            if lowest is None or chunk_low[1] < lowest[1]:
+                lowest = chunk_low
+            buffers = defaultdict(list)  # expense type -> this chunk's amounts
+            for expense_type, amount in chunk:
+                buffers[expense_type].append(amount)
+            count += len(chunk)
+            for expense_type, amounts in buffers.items():
+                category_counts[expense_type] = category_counts.get(expense_type, 0) + len(amounts)
+                if exact:
+                    partials[expense_type] = _fold(partials.get(expense_type, []), amounts)
+                else:
+                    amount = sum(amounts)
+                    total += amount
+                    category_totals[expense_type] = category_totals.get(expense_type, 0) + amount
+
+        self.total = total
+        self.count = count
+        self.highest = highest
+        self.lowest = lowest
+        if exact:
+            self._round_totals()
+        return self
+
+    def _round_totals(self):
+        """Recomputes total and category_totals, rounding the exact sums once."""
+        partials = self._partials
+        self.total = _rounded_sum([f for parts in partials.values() for f in parts]) if partials else 0
+        self.category_totals = {expense_type: parts[0] for expense_type, parts in partials.items()}
+
+    def merge(self, other):
+        """
+        Combines this summary with one covering the expenses that come after it.
+        The merge is associative, and on ties the earlier expense wins, just as in a
+        single pass. If both summaries are exact the totals are identical to a
+        serial run however the expenses were split; otherwise they are float sums
+        and can differ from it in the last bits.
+
+        Args:
+            other (ExpenseSummary): Summary of the following expenses.
+
+        Returns:
+            ExpenseSummary: A new summary covering both; neither input is changed.
+        """
+        merged = ExpenseSummary(self.exact and other.exact)
+        if merged.exact:
+            merged._partials = dict(self._partials)
+            for expense_type, parts in other._partials.items():
+                merged._partials[expense_type] = _fold(merged._partials.get(expense_type, []), parts)
+            merged._round_totals()
+        else:
+            merged.total = self.total + other.total
+            merged.category_totals = dict(self.category_totals)
+            for expense_type, amount in other.category_totals.items():
+                merged.category_totals[expense_type] = merged.category_totals.get(expense_type, 0) + amount
+        merged.count = self.count + other.count
+        merged.highest = self.highest
+        if other.highest is not None and (merged.highest is None or other.highest[1] > merged.highest[1]):
+            merged.highest = other.highest
+        merged.lowest = self.lowest
+        if other.lowest is not None and (merged.lowest is None or other.lowest[1] < merged.lowest[1]):
+            merged.lowest = other.lowest
+        merged.category_counts = dict(self.category_counts)
+        for expense_type, count in other.category_counts.items():
+            merged.category_counts[expense_type] = merged.category_counts.get(expense_type, 0) + count
+        return merged
+
+    def results(self):
+        """
+        Returns:
+            tuple: Same layout as analyze_expense_stream.
+        """
+        if self.highest is None:
+            return 0, ("N/A", 0), ("N/A", 0), {}, {}
+        return self.total, self.highest, self.lowest, self.category_totals, self.category_counts
+
+
+def analyze_expense_stream(expenses, exact=False):
+    """
+    Computes the same results as analyze_expenses, plus per-category totals and
+    counts, in a single pass over any iterable of expenses. Only the running
+    results and one chunk of rows are kept, so memory use does not depend on the
+    number of rows. Amounts are summed per chunk and category, so the total can
+    differ from reduce's running sum in the last bits.
+
+    Args:
+        expenses (iterable): Expense tuples (expense_type, expense_amount).
+        exact (bool): Compute correctly rounded sums (see ExpenseSummary).
+
+    Returns:
+        tuple: A tuple containing:
+               - total (float): Sum of all expense amounts.
+               - highest_expense (tuple): The expense with the highest amount.
+               - lowest_expense (tuple): The expense with the lowest amount.
+               - category_totals (dict): Expense type -> sum of its amounts.
+               - category_counts (dict): Expense type -> number of expenses.
+    """
+    return ExpenseSummary(exact).update(expenses).results()
+
+
+def summarize_ledger(filename, type_column=0, amount_column=1, exact=False):
+    """
+    Streams one CSV ledger into an ExpenseSummary.
+
+    Returns:
+        ExpenseSummary: Summary of every valid expense in the file.
+    """
+    return ExpenseSummary(exact).update(read_ledger(filename, type_column, amount_column))
+
+
+def analyze_ledger_dir(directory, workers=None, type_column=0, amount_column=1, exact=False):
+    """
+    Analyzes every .csv ledger in a directory on a pool of worker processes and
+    reduces the per-file summaries in file-name order. Counts, highest and lowest
+    expense match summarizing the files one after another; the totals do too
+    with exact=True, and otherwise can differ from it in the last bits.
+
+    Args:
+        directory (str): Directory containing the CSV ledgers.
+        workers (int): Number of worker processes (default: one per CPU).
+        exact (bool): Compute correctly rounded sums (see ExpenseSummary).
+
+    Returns:
+        ExpenseSummary: Summary of all ledgers combined.
+    """
+    filenames = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.lower().endswith(".csv"))
+    summarize = partial(summarize_ledger, type_column=type_column, amount_column=amount_column,
+                        exact=exact)
+    if workers == 1:
+        summaries = map(summarize, filenames)
+        return reduce(ExpenseSummary.merge, summaries, ExpenseSummary(exact))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = pool.map(summarize, filenames)
+        return reduce(ExpenseSummary.merge, summaries, ExpenseSummary(exact))
+
+
+def load_ledger_columns(filename, type_column=0, amount_column=1):
+    """
+    Loads a CSV ledger that fits in memory into two NumPy arrays.
+
+    Returns:
+        tuple: (expense_types, expense_amounts) as an object array of str and a
+               float array. Object arrays hand their str back without copies, which
+               keeps grouping by type cheap.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the columnar fast path.")
+    types = []
+    amounts = []
+    for expense_type, amount in read_ledger(filename, type_column, amount_column):
+        types.append(expense_type)
+        amounts.append(amount)
+    return np.array(types, dtype=object), np.array(amounts, dtype=float)
+
+
+def _factorize(values):
+    """
+    Returns (codes, categories) for an array of labels, categories in order of
+    first appearance. A dict lookup per label is much cheaper than np.unique,
+    which sorts the whole array.
+    """
+    codes = {}
+    inverse = np.array([codes.setdefault(value, len(codes)) for value in values.tolist()], dtype=np.intp)
+    return inverse, list(codes)
+
+
+def analyze_expense_columns(expense_types, expense_amounts):
+    """
+    Columnar version of analyze_expense_stream using vectorized NumPy reductions.
+    The total uses NumPy's pairwise summation, so it can differ from the
+    streaming total in the last few bits.
+
+    Args:
+        expense_types (numpy.ndarray): Expense type of each row (an object array
+            of str, as load_ledger_columns returns, is fastest).
+        expense_amounts (numpy.ndarray): Expense amount of each row.
+
+    Returns:
+        tuple: Same layout as analyze_expense_stream.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the columnar fast path.")
+    if expense_amounts.size == 0:
+        return 0, ("N/A", 0), ("N/A", 0), {}, {}
+
+    total = float(expense_amounts.sum())
+    # argmax/argmin return the first of several equal amounts, like reduce does.
+    high = int(expense_amounts.argmax())
+    low = int(expense_amounts.argmin())
+    highest_expense = (str(expense_types[high]), float(expense_amounts[high]))
+    lowest_expense = (str(expense_types[low]), float(expense_amounts[low]))
+
+    inverse, categories = _factorize(expense_types)
+    sums = np.bincount(inverse, weights=expense_amounts, minlength=len(categories))
+    counts = np.bincount(inverse, minlength=len(categories))
+    category_totals = {str(c): float(t) for c, t in zip(categories, sums)}
+    category_counts = {str(c): int(n) for c, n in zip(categories, counts)}
+    return total, highest_expense, lowest_expense, category_totals, category_counts
+
+
 def display_results(total, highest_expense, lowest_expense):
     """
     Displays the analysis of the expenses.
@@ -71,6 +403,56 @@ def display_results(total, highest_expense, lowest_expense):
     print(f"Lowest Expense: {lowest_expense[0]} - ${lowest_expense[1]:.2f}")
 
 
+def display_categories(category_totals, category_counts):
+    """
+    Displays the total and number of expenses for each expense type.
+
+    Args:
+        category_totals (dict): Expense type -> sum of its amounts.
+        category_counts (dict): Expense type -> number of expenses.
+    """
+    print("\nExpenses by Category:")
+    for expense_type in sorted(category_totals):
+        print(f"{expense_type}: ${category_totals[expense_type]:.2f} "
+              f"({category_counts[expense_type]} expenses)")
+
+
+def benchmark(num_rows=1_000_000, repeat=3):
+    """
+    Compares the triple-reduce analyze_expenses with the single-pass stream
+    aggregator and, when NumPy is installed, the columnar fast path.
+
+    Args:
+        num_rows (int): Number of random expenses to analyze.
+        repeat (int): Number of runs; the best time of each is reported.
+    """
+    rng = random.Random(42)
+    categories = ["Rent", "Groceries", "Utilities", "Transport", "Dining", "Insurance"]
+    expenses = [(rng.choice(categories), round(rng.uniform(1, 2000), 2)) for _ in range(num_rows)]
+
+    def best_of(func):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    timings = [
+        ("analyze_expenses (3x reduce)", best_of(lambda: analyze_expenses(expenses))),
+        ("analyze_expense_stream", best_of(lambda: analyze_expense_stream(expenses))),
+        ("analyze_expense_stream (exact)", best_of(lambda: analyze_expense_stream(expenses, exact=True))),
+    ]
+    if np is not None:
+        types = np.array([e[0] for e in expenses], dtype=object)
+        amounts = np.array([e[1] for e in expenses], dtype=float)
+        timings.append(("analyze_expense_columns", best_of(lambda: analyze_expense_columns(types, amounts))))
+
+    print(f"\nBenchmark ({num_rows:,} expenses, best of {repeat}):")
+    for name, seconds in timings:
+        print(f"{name:30} {seconds * 1000:9.1f} ms  {num_rows / seconds:14,.0f} rows/s")
+
+
 def main():
     """
     Main function to run the expense analysis program.
@@ -83,5 +465,46 @@ def main():
     display_results(total, highest, lowest)
 
 
+def cli():
+    """
+    Command-line entry point. Without arguments the interactive program runs;
+    given a CSV ledger the file is analyzed as a stream (or with NumPy).
+    """
+    parser = argparse.ArgumentParser(description="Monthly expense analyzer")
+    parser.add_argument("ledger", nargs="?",
+                        help="CSV ledger of expense type and amount rows, or a directory of ledgers")
+    parser.add_argument("--type-column", type=int, default=0, help="index of the expense type column")
+    parser.add_argument("--amount-column", type=int, default=1, help="index of the amount column")
+    parser.add_argument("--numpy", action="store_true", help="load the ledger into memory and use NumPy")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes for a directory of ledgers")
+    parser.add_argument("--exact", action="store_true",
+                        help="correctly rounded totals that do not depend on how the ledgers are split")
+    parser.add_argument("--benchmark", action="store_true", help="benchmark the aggregation methods")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+    if args.ledger is None:
+        main()
+        return
+
+    if os.path.isdir(args.ledger):
+        results = analyze_ledger_dir(args.ledger, args.workers, args.type_column, args.amount_column,
+                                     args.exact).results()
+    elif args.numpy:
+        types, amounts = load_ledger_columns(args.ledger, args.type_column, args.amount_column)
+        results = analyze_expense_columns(types, amounts)
+    else:
+        results = analyze_expense_stream(read_ledger(args.ledger, args.type_column, args.amount_column),
+                                         args.exact)
+    total, highest, lowest, category_totals, category_counts = results
+    if not category_counts:
+        print("No valid expenses found in the ledger.")
+        return
+    display_results(total, highest, lowest)
+    display_categories(category_totals, category_counts)
+
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -1,6 +1,137 @@
+import argparse
+import csv
+import os
+import random
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def validate_phone(phone):
+# Patterns are compiled once when the module loads instead of on every call.
+PHONE_PATTERN = re.compile(r'^\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}$')
+SSN_PATTERN = re.compile(r'^\d{3}-\d{2}-\d{4}$')
+ZIP_PATTERN = re.compile(r'^\d{5}(-\d{4})?$')
+
+PATTERNS = {
+    "phone": PHONE_PATTERN,
+    "ssn": SSN_PATTERN,
+    "zip": ZIP_PATTERN,
+}
+
+# --- regex-free backends -------------------------------------------------------
+# The accepted formats are short and fixed-length, so they can also be checked with
+# plain string tests ("string") or a small table-driven DFA ("dfa"). Both mirror the
+# regexes exactly: \d is any Unicode decimal digit (str.isdecimal), \s is any
+# Unicode whitespace (str.isspace) and $ also matches before one final newline.
+# They are alternatives for checking the rules without regular expressions, not
+# speedups: the compiled patterns run in C and are faster than either (--benchmark).
+
+BACKENDS = ("regex", "string", "dfa")
+_backend = "regex"
+
+def set_backend(name):
+    """Select the backend used when a validator is called without backend=."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    _backend = name
+
+def _is_separator(char):
+    return char == "-" or char.isspace()
+
+def _phone_str(phone):
+    if phone[-1:] == "\n":
+        phone = phone[:-1]
+    if not 10 <= len(phone) <= 14:
+        return False
+    i = 1 if phone[0] == "(" else 0
+    if not phone[i:i + 3].isdecimal():
+        return False
+    i += 3
+    if phone[i:i + 1] == ")":
+        i += 1
+    if _is_separator(phone[i:i + 1] or "x"):
+        i += 1
+    if not phone[i:i + 3].isdecimal():
+        return False
+    i += 3
+    if _is_separator(phone[i:i + 1] or "x"):
+        i += 1
+    return len(phone) - i == 4 and phone[i:].isdecimal()
+
+def _ssn_str(ssn):
+    if ssn[-1:] == "\n":
+        ssn = ssn[:-1]
+    return (len(ssn) == 11 and ssn[3] == "-" and ssn[6] == "-"
+            and ssn[:3].isdecimal() and ssn[4:6].isdecimal() and ssn[7:].isdecimal())
+
+def _zip_str(zip_code):
+    if zip_code[-1:] == "\n":
+        zip_code = zip_code[:-1]
+    if len(zip_code) == 5:
+        return zip_code.isdecimal()
+    return (len(zip_code) == 10 and zip_code[5] == "-"
+            and zip_code[:5].isdecimal() and zip_code[6:].isdecimal())
+
+# Character classes used by the DFAs: digit, hyphen, space, parentheses, other.
+_ASCII_CLASSES = {chr(code): "x" for code in range(128)}
+_ASCII_CLASSES.update({c: "d" for c in "0123456789"})
+_ASCII_CLASSES.update({c: "s" for c in " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"})
+_ASCII_CLASSES.update({"-": "-", "(": "(", ")": ")"})
+
+def _char_class(char):
+    cls = _ASCII_CLASSES.get(char)
+    if cls is None:
+        cls = "d" if char.isdecimal() else "s" if char.isspace() else "x"
+    return cls
+
+def _build_dfa(tokens, accept_positions=None):
+    """
+    Build a DFA from a list of (classes, optional) tokens. State p means the first p
+    tokens have been consumed; optional tokens can be skipped. Neighbouring tokens
+    never share a class, so the first token that accepts a character is the only
+    possible move. Returns (transition table, accepting states).
+    """
+    table = []
+    for position in range(len(tokens) + 1):
+        moves = {}
+        for target in range(position, len(tokens)):
+            classes, optional = tokens[target]
+            for cls in classes:
+                moves.setdefault(cls, target + 1)
+            if not optional:
+                break
+        table.append(moves)
+    if accept_positions is None:
+        accept_positions = {p for p in range(len(tokens) + 1)
+                            if all(optional for _, optional in tokens[p:])}
+    return table, frozenset(accept_positions)
+
+_DIGIT = ("d", False)
+_PHONE_DFA = _build_dfa([("(", True), _DIGIT, _DIGIT, _DIGIT, (")", True), ("-s", True),
+                         _DIGIT, _DIGIT, _DIGIT, ("-s", True), _DIGIT, _DIGIT, _DIGIT, _DIGIT])
+_SSN_DFA = _build_dfa([_DIGIT] * 3 + [("-", False)] + [_DIGIT] * 2 + [("-", False)] + [_DIGIT] * 4)
+_ZIP_DFA = _build_dfa([_DIGIT] * 5 + [("-", False)] + [_DIGIT] * 4, accept_positions={5, 10})
+
+def _run_dfa(dfa, text):
+    table, accept = dfa
+    if text[-1:] == "\n":
+        text = text[:-1]
+    state = 0
+    for char in text:
+        state = table[state].get(_char_class(char))
+        if state is None:
+            return False
+    return state in accept
+
+_VALIDATORS = {
+    "regex": {kind: (lambda value, match=pattern.match: bool(match(value)))
+              for kind, pattern in PATTERNS.items()},
+    "string": {"phone": _phone_str, "ssn": _ssn_str, "zip": _zip_str},
+    "dfa": {kind: (lambda value, dfa=dfa: _run_dfa(dfa, value))
+            for kind, dfa in (("phone", _PHONE_DFA), ("ssn", _SSN_DFA), ("zip", _ZIP_DFA))},
+}
+
+def validate_phone(phone, backend=None):
     """
     Validate a phone number.
     Acceptable formats:
@@ -8,27 +139,205 @@ def validate_phone(phone):
       - (123) 456-7890
       - 123 456 7890
       - 1234567890
+    backend is "regex", "string" or "dfa" (default: the one chosen with set_backend).
     """
-    pattern = re.compile(r'^\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}$')
-    return bool(pattern.match(phone))
+    return _VALIDATORS[backend or _backend]["phone"](phone)
 
-def validate_ssn(ssn):
+def validate_ssn(ssn, backend=None):
     """
     Validate a Social Security Number (SSN).
     Expected format: 123-45-6789
+    backend is "regex", "string" or "dfa" (default: the one chosen with set_backend).
     """
-    pattern = re.compile(r'^\d{3}-\d{2}-\d{4}$')
-    return bool(pattern.match(ssn))
+    return _VALIDATORS[backend or _backend]["ssn"](ssn)
 
-def validate_zip(zip_code):
+def validate_zip(zip_code, backend=None):
     """
     Validate a U.S. zip code.
     Acceptable formats:
       - 12345
       - 12345-6789
+    backend is "regex", "string" or "dfa" (default: the one chosen with set_backend).
+    """
+    return _VALIDATORS[backend or _backend]["zip"](zip_code)
+
+def validate_column(values, kind, backend=None):
+    """
+    Validate a whole column of strings at once.
+    values can be a list, a NumPy string array, a pandas Series or any iterable of str;
+    kind is "phone", "ssn" or "zip" and backend is as for validate_phone. In NumPy and
+    pandas columns only str values can be valid: missing values (None, NaN) and
+    numbers count as invalid, whatever the container.
+    Returns (mask, invalid_count) where mask is a bytearray holding 1 for each valid
+    value and 0 for each invalid one. numpy.frombuffer(mask, dtype=bool) views it as a
+    boolean array without copying.
+    """
+    backend = backend or _backend
+    if hasattr(values, "dtype") and getattr(values.dtype, "kind", "O") != "U":
+        # Object, string and numeric columns may hold None, NaN or numbers: any value
+        # that is not a str becomes "" (invalid).
+        values = [value if isinstance(value, str) else "" for value in values.tolist()]
+    if backend == "regex":
+        mask = bytearray(map(bool, map(PATTERNS[kind].match, values)))
+    else:
+        mask = bytearray(map(_VALIDATORS[backend][kind], values))
+    return mask, len(mask) - mask.count(1)
+
+def _column_index(header, column):
+    """Turn a column name or index into an index into the CSV rows."""
+    if isinstance(column, int):
+        return column
+    if column.isdigit():
+        return int(column)
+    return header.index(column)
+
+def _validate_rows(rows, index, kind, chunk_rows, backend):
+    """Validate one column of CSV rows, chunk_rows rows at a time."""
+    mask = bytearray()
+    invalid = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row[index] if index < len(row) else "")
+        if len(chunk) >= chunk_rows:
+            part, bad = validate_column(chunk, kind, backend)
+            mask += part
+            invalid += bad
+            chunk = []
+    part, bad = validate_column(chunk, kind, backend)
+    return mask + part, invalid + bad
+
+def _validate_csv_range(filename, start, end, index, kind, skip_header, chunk_rows, backend):
+    """
+    Validate the rows that begin inside the byte range [start, end) of a CSV file.
+    Used by the worker processes of validate_csv_column.
+    """
+    def lines():
+        with open(filename, "rb") as csv_file:
+            if start:
+                # Skip the partial line; it belongs to the previous range.
+                csv_file.seek(start - 1)
+                csv_file.readline()
+            if skip_header:
+                csv_file.readline()
+            while csv_file.tell() < end:
+                line = csv_file.readline()
+                if not line:
+                    break
+                yield line.decode("utf-8", "replace")
+
+    mask, invalid = _validate_rows(csv.reader(lines()), index, kind, chunk_rows, backend)
+    return bytes(mask), invalid
+
+def validate_csv_column(filename, column, kind, header=True, workers=None, chunk_rows=100_000,
+                        backend=None):
+    """
+    Validate one column of a CSV file as a stream of row chunks.
+    column is a column name (when the file has a header) or a column index.
+    With workers > 1 the file is split into byte ranges validated by a process pool;
+    that mode assumes no field contains an embedded newline.
+    Returns (mask, invalid_count) as validate_column does.
+    """
+    with open(filename, newline="", encoding="utf-8", errors="replace") as csv_file:
+        reader = csv.reader(csv_file)
+        first_row = next(reader, []) if header else []
+        index = _column_index(first_row, column)
+
+        if not workers or workers == 1:
+            return _validate_rows(reader, index, kind, chunk_rows, backend)
+
+    # Worker processes do not see set_backend() calls made in this one.
+    backend = backend or _backend
+    size = os.path.getsize(filename)
+    step = max(size // workers, 1)
+    bounds = list(range(0, size, step)) + [size]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_validate_csv_range, filename, start, end, index, kind,
+                               header and start == 0, chunk_rows, backend)
+                   for start, end in zip(bounds, bounds[1:])]
+        mask = bytearray()
+        invalid = 0
+        for future in futures:
+            part, bad = future.result()
+            mask += part
+            invalid += bad
+    return mask, invalid
+
+def _random_samples(count, seed):
+    """Random and adversarial strings around the accepted formats."""
+    rng = random.Random(seed)
+    alphabet = ["0", "5", "9", "-", " ", "(", ")", "\t", "\n", "a", ".", "\u0663",
+                "\uff15", "\u2003", "\xa0", "\u00b2", "\x1c"]
+    templates = ["123-456-7890", "(123) 456-7890", "123 456 7890", "1234567890",
+                 "123-45-6789", "12345", "12345-6789"]
+    samples = ["", "\n", "(", "()", "1234567890\n", "1234567890\n\n", "123-45-6789\n",
+               "12345\n", "\n12345", "(123)4567890", "123)456-7890", "(123-456-7890",
+               "123--456-7890", "\u0661\u0662\u0663\u0664\u0665", "12345-678",
+               "12345 6789", "123\u2003456\u20037890", "123\n456\n7890", "\u00b2" * 5]
+    for _ in range(count):
+        if rng.random() < 0.6:
+            # Mutate a valid value: replace, insert or delete a few characters.
+            chars = list(rng.choice(templates))
+            for _ in range(rng.randint(0, 2)):
+                action = rng.random()
+                pos = rng.randrange(len(chars) + 1)
+                if action < 0.4 and pos < len(chars):
+                    chars[pos] = rng.choice(alphabet)
+                elif action < 0.7:
+                    chars.insert(pos, rng.choice(alphabet))
+                elif chars:
+                    del chars[min(pos, len(chars) - 1)]
+            samples.append("".join(chars))
+        else:
+            samples.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15))))
+    return samples
+
+def check_backends(count=200_000, seed=0):
+    """
+    Check that every backend agrees with the regex validators on random and
+    adversarial inputs. Raises AssertionError on the first disagreement.
     """
-    pattern = re.compile(r'^\d{5}(-\d{4})?$')
-    return bool(pattern.match(zip_code))
+    samples = _random_samples(count, seed)
+    for kind, pattern in PATTERNS.items():
+        for value in samples:
+            expected = bool(pattern.match(value))
+            for backend in BACKENDS:
+                result = _VALIDATORS[backend][kind](value)
+                assert result == expected, f"{backend} {kind} backend disagrees on {value!r}"
+    _check_mixed_columns()
+    print(f"All backends agree with the regex validators on {len(samples)} inputs.")
+
+def _check_mixed_columns():
+    """Mixed-type NumPy and pandas columns must validate the same in every backend."""
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    values = ["12345", 12345, None, float("nan"), "1234", 12345.0]
+    expected = bytearray([1, 0, 0, 0, 0, 0])
+    columns = [(np.array(values, dtype=object), expected)]
+    try:
+        import pandas as pd
+    except ImportError:
+        pass
+    else:
+        columns += [(pd.Series(values), expected), (pd.Series(values, dtype=object), expected),
+                    (pd.Series([12345, 67890]), bytearray(2))]
+    for column, mask in columns:
+        for backend in BACKENDS:
+            result, _ = validate_column(column, "zip", backend)
+            assert result == mask, \
+                f"{backend} backend: mixed {type(column).__name__} column gives {list(result)}"
+
+def benchmark_backends(count=200_000, seed=1):
+    """Report strings/second for each backend and format."""
+    samples = _random_samples(count, seed)
+    print(f"{'format':8}{'backend':>8}{'strings/s':>16}")
+    for kind in PATTERNS:
+        for backend in BACKENDS:
+            start = time.perf_counter()
+            validate_column(samples, kind, backend)
+            elapsed = time.perf_counter() - start
+            print(f"{kind:8}{backend:>8}{len(samples) / elapsed:16,.0f}")
 
 def main():
     phone = input("Enter a phone number: ")
@@ -50,5 +359,39 @@ def main():
     else:
         print("Invalid zip code.")
 
+def cli():
+    """
+    Command-line entry point. Without arguments the interactive validator runs;
+    given a CSV file, one column of it is validated in bulk.
+    """
+    parser = argparse.ArgumentParser(description="Phone, SSN and zip code validator")
+    parser.add_argument("csv_file", nargs="?", help="CSV file with a column to validate")
+    parser.add_argument("--column", help="column name or index to validate")
+    parser.add_argument("--kind", choices=sorted(PATTERNS), help="format of the column")
+    parser.add_argument("--no-header", action="store_true", help="the CSV file has no header row")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes for large files")
+    parser.add_argument("--backend", choices=BACKENDS, default="regex", help="validation backend")
+    parser.add_argument("--check-backends", action="store_true",
+                        help="check the backends against the regex validators")
+    parser.add_argument("--benchmark", action="store_true", help="report strings/second per backend")
+    args = parser.parse_args()
+    set_backend(args.backend)
+
+    if args.check_backends:
+        check_backends()
+        return
+    if args.benchmark:
+        benchmark_backends()
+        return
+    if args.csv_file is None:
+        main()
+        return
+    if args.column is None or args.kind is None:
+        parser.error("--column and --kind are required with a CSV file")
+
+    mask, invalid = validate_csv_column(args.csv_file, args.column, args.kind,
+                                        header=not args.no_header, workers=args.workers)
+    print(f"Checked {len(mask)} values: {len(mask) - invalid} valid, {invalid} invalid.")
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -1,4 +1,30 @@
+import argparse
+import mmap
+import os
 import re
+import tempfile
+import time
+import tracemalloc
+from array import array
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for sentence_spans(..., as_numpy=True)
+    np = None
+
+# Same patterns split_into_sentences uses, compiled once for the streaming segmenter.
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+NUMERIC_MARKER = re.compile(r'\d+\.')
+
+# UTF-8 equivalents for scanning bytes (e.g. a memory-mapped file). A bytes \s only
+# knows ASCII whitespace, so spell out every character str.isspace() accepts.
+_UNICODE_SPACES = ('\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002'
+                   '\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000')
+_UTF8_SPACE = b'(?:' + b'|'.join(re.escape(c.encode('utf-8')) for c in _UNICODE_SPACES) + b')'
+SENTENCE_BREAK_BYTES = re.compile(rb'(?<=[.!?])' + _UTF8_SPACE + b'+')
+LEADING_SPACE_BYTES = re.compile(_UTF8_SPACE + b'*')
+NUMERIC_MARKER_BYTES = re.compile(rb'[0-9]+\.')
 
 
 def split_into_sentences(paragraph: str) -> list:
@@ -31,6 +57,252 @@ def split_into_sentences(paragraph: str) -> list:
     return merged_sentences
 
 
+def _iter_fragments(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the same fragments as re.split(r'(?<=[.!?])\\s+', text.strip()) would on the
+    concatenated chunks, as soon as each one is complete. Only the unfinished
+    fragment is buffered between chunks.
+    """
+    buffer = ""
+    started = False
+    for chunk in chunks:
+        if not started:
+            # Leading whitespace is dropped, as text.strip() would.
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        # Resume scanning at the trailing whitespace of the old buffer: a break
+        # that touched its end may grow with the new chunk.
+        scan_from = len(buffer)
+        while scan_from and buffer[scan_from - 1].isspace():
+            scan_from -= 1
+        buffer += chunk
+
+        start = 0
+        for match in SENTENCE_BREAK.finditer(buffer, scan_from):
+            # A break running into the end of the buffer may continue in the next
+            # chunk, or be trailing whitespace that strip() removes.
+            if match.end() == len(buffer):
+                break
+            yield buffer[start:match.start()]
+            start = match.end()
+        buffer = buffer[start:]
+
+    yield from SENTENCE_BREAK.split(buffer.rstrip())
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming version of split_into_sentences. Consumes text in chunks (any iterable
+    of strings, such as an open file) and yields each sentence as soon as it is
+    complete, carrying partial sentences and numeric markers like '1.' across chunk
+    boundaries. Memory use is bounded by the longest sentence, not the input size.
+
+    Args:
+        chunks (Iterable[str]): The text, split into pieces at arbitrary points.
+
+    Yields:
+        str: The same sentences split_into_sentences returns for the joined text.
+    """
+    pending_marker = None
+    for fragment in _iter_fragments(chunks):
+        if pending_marker is not None:
+            # Merge the numeric marker with the following sentence.
+            yield pending_marker + " " + fragment
+            pending_marker = None
+        elif NUMERIC_MARKER.fullmatch(fragment):
+            pending_marker = fragment
+        else:
+            yield fragment
+    if pending_marker is not None:
+        yield pending_marker
+
+
+def iter_file_sentences(filename: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """
+    Yields the sentences of a text file, reading it chunk_size characters at a time.
+
+    Args:
+        filename (str): Path to a UTF-8 text file.
+        chunk_size (int): Number of characters to read per chunk.
+    """
+    with open(filename, encoding="utf-8") as text_file:
+        yield from iter_sentences(iter(lambda: text_file.read(chunk_size), ""))
+
+
+def _rstrip_end(text, end: int) -> int:
+    """Returns the end offset of text[:end] with trailing whitespace removed."""
+    if isinstance(text, str):
+        while end and text[end - 1].isspace():
+            end -= 1
+        return end
+    while end:
+        # UTF-8 whitespace is one to three bytes long.
+        for width in range(1, min(end, 3) + 1):
+            try:
+                char = bytes(text[end - width:end]).decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            if char.isspace():
+                end -= width
+                break
+        else:
+            return end
+    return end
+
+
+def _is_numeric_marker_bytes(text, start: int, end: int) -> bool:
+    if NUMERIC_MARKER_BYTES.fullmatch(text, start, end):
+        return True
+    # Non-ASCII digits (e.g. Arabic-Indic, possibly mixed with ASCII ones) need a
+    # decode; only fragments ending in '.' with a byte >= 0x80 can match.
+    if end - start < 3 or text[end - 1] != 0x2E:
+        return False
+    fragment = bytes(text[start:end])
+    return (not fragment.isascii()
+            and NUMERIC_MARKER.fullmatch(fragment.decode('utf-8', 'replace')) is not None)
+
+
+def sentence_spans(text, as_numpy: bool = False):
+    """
+    Finds the same sentences as split_into_sentences, but returns their (start, end)
+    offsets instead of new strings. text may be a str or any bytes-like UTF-8 buffer,
+    including an mmap, in which case the offsets are byte offsets and nothing is copied.
+
+    Slicing text[start:end] gives the sentence as it appears in the text. For a
+    merged numeric marker such as '1.' that keeps the original whitespace between
+    the marker and its sentence, where split_into_sentences joins them with one space.
+
+    Args:
+        text (str | bytes | mmap.mmap): The text to segment.
+        as_numpy (bool): Return an (n, 2) uint64 NumPy view instead of the array.
+
+    Returns:
+        array: array('Q') of interleaved offsets [start0, end0, start1, end1, ...].
+    """
+    if isinstance(text, str):
+        start = len(text) - len(text.lstrip())
+        breaks = SENTENCE_BREAK
+        is_marker = NUMERIC_MARKER.fullmatch
+    else:
+        start = LEADING_SPACE_BYTES.match(text).end()
+        breaks = SENTENCE_BREAK_BYTES
+        is_marker = _is_numeric_marker_bytes
+    end = _rstrip_end(text, len(text))
+
+    spans = array('Q')
+    append = spans.append
+    pending_marker = None
+    fragment_start = start
+    for match in breaks.finditer(text, start, max(start, end)):
+        fragment_end = match.start()
+        if pending_marker is not None:
+            # Merge the numeric marker with the following sentence.
+            append(pending_marker)
+            append(fragment_end)
+            pending_marker = None
+        elif is_marker(text, fragment_start, fragment_end):
+            pending_marker = fragment_start
+        else:
+            append(fragment_start)
+            append(fragment_end)
+        fragment_start = match.end()
+    append(fragment_start if pending_marker is None else pending_marker)
+    append(end)
+
+    if as_numpy:
+        if np is None:
+            raise ImportError("NumPy is required for as_numpy=True.")
+        return np.frombuffer(spans, dtype=np.uint64).reshape(-1, 2)
+    return spans
+
+
+def mmap_sentence_spans(filename: str):
+    """
+    Memory-maps a UTF-8 text file and finds its sentence spans without reading it
+    into a Python string.
+
+    Args:
+        filename (str): Path to the text file.
+
+    Returns:
+        tuple: (buffer, spans) where buffer is the mmap (or b'' for an empty file)
+               and spans holds byte offsets as returned by sentence_spans.
+    """
+    with open(filename, 'rb') as text_file:
+        try:
+            buffer = mmap.mmap(text_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            buffer = b''
+    return buffer, sentence_spans(buffer)
+
+
+def iter_span_text(text, spans) -> Iterator[str]:
+    """
+    Lazily slices (and for bytes, decodes) the sentences described by spans.
+
+    Args:
+        text (str | bytes | mmap.mmap): The text the spans were computed on.
+        spans (array): Interleaved offsets from sentence_spans.
+    """
+    for i in range(0, len(spans), 2):
+        sentence = text[spans[i]:spans[i + 1]]
+        yield sentence if isinstance(sentence, str) else sentence.decode('utf-8', 'replace')
+
+
+def benchmark_spans(num_sentences: int = 200_000):
+    """
+    Compares split_into_sentences with sentence_spans on an in-memory string and
+    on a memory-mapped file, reporting time, sentences/second and peak memory.
+
+    Args:
+        num_sentences (int): Number of sentences in the generated text.
+    """
+    parts = ["The quick brown fox jumps over the lazy dog.", "1. Is it raining?",
+             "Yes!", "2. It is sunny today."]
+    text = " ".join(parts[i % len(parts)] for i in range(num_sentences))
+    with tempfile.TemporaryDirectory() as scratch:
+        filename = os.path.join(scratch, "sentences.txt")
+        with open(filename, "w", encoding="utf-8") as text_file:
+            text_file.write(text)
+        _benchmark_runs(text, filename)
+
+
+def _mmap_spans_only(filename: str):
+    buffer, spans = mmap_sentence_spans(filename)
+    if isinstance(buffer, mmap.mmap):
+        buffer.close()
+    return spans
+
+
+def _benchmark_runs(text: str, filename: str):
+    """Times each API on the same text and prints one line per run."""
+    def measure(func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        del result
+        # Measure memory in a second run so tracing does not skew the timing.
+        tracemalloc.start()
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak
+
+    runs = [
+        ("split_into_sentences (str)", lambda: split_into_sentences(text)),
+        ("sentence_spans (str)", lambda: sentence_spans(text)),
+        ("mmap_sentence_spans (file)", lambda: _mmap_spans_only(filename)),
+    ]
+    print(f"{len(text):,} characters:")
+    for name, func in runs:
+        result, elapsed, peak = measure(func)
+        count = len(result) if isinstance(result, list) else len(result) // 2
+        print(f"  {name:28} {elapsed * 1000:8.1f} ms  {count / elapsed:12,.0f} sentences/s  "
+              f"peak {peak / 1e6:7.1f} MB")
+
+
 def display_sentences(sentences: list):
     """
     Displays each sentence along with its index, then prints the total count.
@@ -52,5 +324,32 @@ def main():
     display_sentences(sentences)
 
 
+def cli():
+    """
+    Command-line entry point. Without arguments the interactive prompt runs; given
+    a text file, its sentences are streamed to the screen (or only counted with --spans).
+    """
+    parser = argparse.ArgumentParser(description="Split text into sentences")
+    parser.add_argument("file", nargs="?", help="UTF-8 text file to segment")
+    parser.add_argument("--spans", action="store_true",
+                        help="memory-map the file and only compute sentence offsets")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare the list-of-strings and span APIs")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_spans()
+    elif args.file is None:
+        main()
+    elif args.spans:
+        _, spans = mmap_sentence_spans(args.file)
+        print(f"Total number of sentences: {len(spans) // 2}")
+    else:
+        count = 0
+        for count, sentence in enumerate(iter_file_sentences(args.file), start=1):
+            print(f"Sentence {count}: {sentence}")
+        print(f"\nTotal number of sentences: {count}")
+
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -1,19 +1,147 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+
 import numpy as np
 import pandas as pd
-import sys
 
 PASS_MARK = 60  # ≥ 60 is a pass
+CHUNKED_THRESHOLD = 512 * 1024 ** 2  # files larger than this (bytes) are streamed
+CHUNK_ROWS = 100_000                 # rows per block in chunked mode
+SKETCH_BINS = 2048                   # max bins per median sketch
+CACHE_DIR = ".grades_cache"          # binary cache, created next to the CSV
+
 
+def load_data(filename: str, use_cache: bool = True, cache_dir: str = None):
+    """Load CSV and return (DataFrame, numeric‑only NumPy array).
 
-def load_data(filename: str):
-    """Load CSV and return (DataFrame, numeric‑only NumPy array)."""
+    With ``use_cache`` the parsed data is kept as memory-mapped ``.npy`` files;
+    later loads of the unchanged CSV map them instead of re-parsing the text.
+    """
+    if use_cache:
+        cached = _load_cache(filename, cache_dir)
+        if cached is not None:
+            return cached
     df = pd.read_csv(filename)
-    grades = df.iloc[:, 2:].to_numpy(dtype=float)  # exams start at col index 2
+    grades = df.iloc[:, 2:].to_numpy(dtype=float)  # exams start at col index 2
+    if use_cache:
+        _write_cache(filename, cache_dir, df, grades)
     return df, grades
 
 
+# --------------------------------------------------------------------------- #
+# Binary cache
+# --------------------------------------------------------------------------- #
+def _cache_path(filename: str, cache_dir: str = None) -> str:
+    """Cache entry for the CSV as it is right now (path, size and mtime).
+
+    Entries are named ``<basename>-<path hash>-<state hash>``; everything before
+    the last dash identifies the source file, so CSVs that share a basename and
+    a ``cache_dir`` never collide.
+    """
+    source = os.path.abspath(filename)
+    st = os.stat(source)
+    where = hashlib.sha1(source.encode()).hexdigest()[:16]
+    key = hashlib.sha1(f"{source}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:16]
+    cache_dir = cache_dir or os.path.join(os.path.dirname(source), CACHE_DIR)
+    return os.path.join(cache_dir, f"{os.path.basename(source)}-{where}-{key}")
+
+
+def _load_cache(filename: str, cache_dir: str = None):
+    """Map a cached (DataFrame, grades) pair, or None if there is no valid entry."""
+    entry = _cache_path(filename, cache_dir)
+    try:
+        with open(os.path.join(entry, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        grades = np.load(os.path.join(entry, "grades.npy"), mmap_mode="r")
+        columns = {name: np.load(os.path.join(entry, f"col{i}.npy"), mmap_mode="r")
+                   for i, name in enumerate(meta["columns"])}
+    except (OSError, ValueError, KeyError):
+        return None
+    # copy=False keeps the numeric columns as views of the mapped files
+    return pd.DataFrame(columns, copy=False), grades
+
+
+def _write_cache(filename: str, cache_dir: str, df: pd.DataFrame, grades: np.ndarray) -> None:
+    """Store the parsed CSV as .npy files and drop stale entries for the same CSV."""
+    text_cols = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if df[text_cols].isna().any().any() or not all(isinstance(c, str) for c in df.columns):
+        return  # missing names would not survive the string arrays; just don't cache
+    entry = _cache_path(filename, cache_dir)
+    parent = os.path.dirname(entry)
+    prefix = os.path.basename(entry).rsplit("-", 1)[0]
+    try:
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    except OSError:
+        return  # read-only location: run without a cache
+    try:
+        np.save(os.path.join(tmp, "grades.npy"), np.ascontiguousarray(grades))
+        for i, name in enumerate(df.columns):
+            col = df[name]
+            values = col.to_numpy(dtype=str) if name in text_cols else col.to_numpy()
+            np.save(os.path.join(tmp, f"col{i}.npy"), values)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"source": os.path.abspath(filename), "columns": list(df.columns)}, f)
+        # older entries for this CSV (same path hash) are stale now
+        for name in os.listdir(parent):
+            if name.rsplit("-", 1)[0] == prefix:
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+        os.replace(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _median(values: np.ndarray, axis=None):
+    """Median via a single partition (np.median semantics, NaN propagates)."""
+    if axis is None:
+        values = values.ravel()
+        axis = 0
+    n = values.shape[0]
+    if n == 0:
+        return np.full(values.shape[1:], np.nan)[()]
+    mid = n // 2
+    part = np.partition(values, mid, axis=0)
+    middle = part[mid]
+    if n % 2 == 0:
+        # Everything before mid is <= part[mid], so its max is the other middle value.
+        middle = (part[:mid].max(axis=0) + middle) / 2
+    # Partitioning moves NaN out of the way; np.median returns NaN instead.
+    return np.where(np.isnan(values).any(axis=0), np.nan, middle)[()]
+
+
 def per_exam_stats(grades: np.ndarray):
     """Return a dict of stats for each exam (column)."""
+    # One vectorized reduction per statistic covers every exam at once.
+    means = grades.mean(axis=0)
+    medians = _median(grades, axis=0)
+    stds = grades.std(axis=0, ddof=1)
+    mins = grades.min(axis=0)
+    maxs = grades.max(axis=0)
+    passed = np.count_nonzero(grades >= PASS_MARK, axis=0)
+    failed = np.count_nonzero(grades < PASS_MARK, axis=0)
+
+    return {
+        idx + 1: {
+            "mean":   means[idx],
+            "median": medians[idx],
+            "std":    stds[idx],
+            "min":    mins[idx],
+            "max":    maxs[idx],
+            "passed": int(passed[idx]),
+            "failed": int(failed[idx]),
+        }
+        for idx in range(grades.shape[1])
+    }
+
+
+def _per_exam_stats_loop(grades: np.ndarray):
+    """Original column-by-column per_exam_stats, kept as the benchmark baseline."""
     stats = {}
     for idx in range(grades.shape[1]):
         col = grades[:, idx]
@@ -31,34 +159,283 @@ def per_exam_stats(grades: np.ndarray):
 
 def overall_stats(grades: np.ndarray):
     """Return aggregate stats across *all* exams for *all* students."""
-    flat = grades.flatten()
+    # Whole-array reductions need no flattened copy; only the median partition does.
     return {
-        "mean":      np.mean(flat),
-        "median":    np.median(flat),
-        "std":       np.std(flat, ddof=1),
-        "min":       np.min(flat),
-        "max":       np.max(flat),
-        "pass_pct":  np.sum(flat >= PASS_MARK) / flat.size * 100,
+        "mean":      grades.mean(),
+        "median":    _median(grades.ravel()),
+        "std":       grades.std(ddof=1),
+        "min":       grades.min(),
+        "max":       grades.max(),
+        "pass_pct":  np.count_nonzero(grades >= PASS_MARK) / grades.size * 100,
     }
 
 
-def main(filename: str = "grades.csv"):
-    df, grades = load_data(filename)
+# --------------------------------------------------------------------------- #
+# Chunked (out-of-core) mode
+# --------------------------------------------------------------------------- #
+class QuantileSketch:
+    """Mergeable histogram sketch for medians of data streamed in chunks.
+
+    Values are counted exactly while there are at most ``bins`` distinct ones
+    (always the case for integer grades), so the median is then exact.  Past
+    that, values fall into bins of width ``w`` (a power of two, doubled as
+    needed) and the median is the midpoint of its bin, so the error is at most
+    ``w / 2 < (max - min) / (bins - 1)``.
+    """
+
+    def __init__(self, bins: int = SKETCH_BINS):
+        self.bins = bins
+        self.width = 0.0   # 0 = exact values, else bin width
+        self.counts = {}   # value (exact) or bin index -> count
+        self.count = 0
+        self.has_nan = False
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: np.ndarray) -> None:
+        """Add a block of values."""
+        values = np.asarray(values, dtype=float).ravel()
+        nan = np.isnan(values)
+        if nan.any():
+            self.has_nan = True
+            values = values[~nan]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        keys = values if self.width == 0 else np.floor(values / self.width)
+        uniq, cnt = np.unique(keys, return_counts=True)
+        self._add_counts(zip(uniq.tolist(), cnt.tolist()))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one and return self."""
+        width = max(self.width, other.width)
+        self._rebin(width)
+        self._add_counts(other._counts_at(width).items())
+        self.count += other.count
+        self.has_nan |= other.has_nan
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def median(self) -> float:
+        """Median of everything added (np.median semantics: NaN if any NaN)."""
+        if self.has_nan or self.count == 0:
+            return np.nan
+        mid = self.count // 2
+        if self.count % 2:
+            return self._value_at(mid)
+        return (self._value_at(mid - 1) + self._value_at(mid)) / 2
+
+    # -- internals ----------------------------------------------------------
+    def _add_counts(self, items) -> None:
+        counts = self.counts
+        for key, n in items:
+            counts[key] = counts.get(key, 0) + n
+        self._compress()
+
+    def _counts_at(self, width: float) -> dict:
+        """Counts re-keyed for a (wider or equal) bin width."""
+        if width == self.width:
+            return self.counts
+        counts = {}
+        for key, n in self.counts.items():
+            new = math.floor(key / width) if self.width == 0 else math.floor(key * self.width / width)
+            counts[new] = counts.get(new, 0) + n
+        return counts
+
+    def _rebin(self, width: float) -> None:
+        self.counts = self._counts_at(width)
+        self.width = width
+
+    def _compress(self) -> None:
+        while len(self.counts) > self.bins:
+            if self.width == 0:
+                # smallest power of two that could fit the range into `bins` bins
+                self._rebin(2.0 ** math.ceil(math.log2((self.max - self.min) / self.bins)))
+            else:
+                self._rebin(self.width * 2)
+
+    def _value_at(self, rank: int) -> float:
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                if self.width == 0:
+                    return key
+                mid = (key + 0.5) * self.width
+                return min(max(mid, self.min), self.max)
+        return self.max
+
+
+class RunningGradeStats:
+    """Mergeable per-exam running moments (Chan et al.) plus pass/fail counts.
+
+    Memory is O(exams) apart from the median sketches; mean, std, min, max and
+    pass counts match the in-memory statistics up to float rounding.
+    """
+
+    def __init__(self, n_exams: int, sketch_bins: int = SKETCH_BINS):
+        self.sketch_bins = sketch_bins
+        self.n = 0
+        self.mean = np.zeros(n_exams)
+        self.m2 = np.zeros(n_exams)
+        self.min = np.full(n_exams, np.inf)
+        self.max = np.full(n_exams, -np.inf)
+        self.passed = np.zeros(n_exams, dtype=np.int64)
+        self.failed = np.zeros(n_exams, dtype=np.int64)
+        self.sketches = [QuantileSketch(sketch_bins) for _ in range(n_exams)]
+
+    def update(self, grades: np.ndarray) -> None:
+        """Add a block of rows (students × exams)."""
+        block = RunningGradeStats(grades.shape[1], self.sketch_bins)
+        block.n = grades.shape[0]
+        if block.n == 0:
+            return
+        block.mean = grades.mean(axis=0)
+        block.m2 = ((grades - block.mean) ** 2).sum(axis=0)
+        block.min = grades.min(axis=0)
+        block.max = grades.max(axis=0)
+        block.passed = np.count_nonzero(grades >= PASS_MARK, axis=0)
+        block.failed = np.count_nonzero(grades < PASS_MARK, axis=0)
+        for sketch, column in zip(block.sketches, grades.T):
+            sketch.add(column)
+        self.merge(block)
+
+    def merge(self, other: "RunningGradeStats") -> "RunningGradeStats":
+        """Fold another partial result into this one (Chan's parallel update)."""
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.n / n
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.n * other.n / n
+        self.n = n
+        # np.minimum/np.maximum propagate NaN just like np.min/np.max
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.passed = self.passed + other.passed
+        self.failed = self.failed + other.failed
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        return self
+
+    def per_exam(self) -> dict:
+        """Same dict layout as per_exam_stats."""
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.full_like(self.m2, np.nan)
+        return {
+            idx + 1: {
+                "mean":   self.mean[idx],
+                "median": self.sketches[idx].median(),
+                "std":    std[idx],
+                "min":    self.min[idx],
+                "max":    self.max[idx],
+                "passed": int(self.passed[idx]),
+                "failed": int(self.failed[idx]),
+            }
+            for idx in range(self.mean.size)
+        }
+
+    def overall(self) -> dict:
+        """Same dict layout as overall_stats (exams combined as equal-sized groups)."""
+        total = self.n * self.mean.size
+        mean = self.mean.mean()
+        m2 = self.m2.sum() + self.n * ((self.mean - mean) ** 2).sum()
+        combined = QuantileSketch(self.sketch_bins)
+        for sketch in self.sketches:
+            combined.merge(sketch)
+        return {
+            "mean":      mean,
+            "median":    combined.median(),
+            "std":       np.sqrt(m2 / (total - 1)) if total > 1 else np.nan,
+            "min":       self.min.min(),
+            "max":       self.max.max(),
+            "pass_pct":  self.passed.sum() / total * 100,
+        }
+
+
+def chunked_stats(filename: str, chunksize: int = CHUNK_ROWS, sketch_bins: int = SKETCH_BINS):
+    """Stream the CSV in row blocks; return (head DataFrame, per-exam, overall)."""
+    head = None
+    stats = None
+    for chunk in pd.read_csv(filename, chunksize=chunksize):
+        grades = chunk.iloc[:, 2:].to_numpy(dtype=float)
+        if stats is None:
+            head = chunk.head()
+            stats = RunningGradeStats(grades.shape[1], sketch_bins)
+        elif len(head) < 5:  # tiny chunks: keep filling the preview
+            head = pd.concat([head, chunk.head(5 - len(head))])
+        stats.update(grades)
+    if stats is None:
+        raise ValueError(f"{filename} has no grade rows")
+    return head, stats.per_exam(), stats.overall()
+
+
+def benchmark(students=(1_000, 10_000, 100_000), exams=(10, 100, 1_000),
+              max_cells: int = 20_000_000):
+    """Time the loop and vectorized per-exam stats across gradebook shapes."""
+    rng = np.random.default_rng(42)
+    print(f"{'students':>9} {'exams':>6} {'loop (ms)':>11} {'vectorized (ms)':>16} {'speed-up':>9}")
+    for n_students in students:
+        for n_exams in exams:
+            if n_students * n_exams > max_cells:
+                continue
+            grades = rng.integers(0, 101, size=(n_students, n_exams)).astype(float)
+            timings = []
+            for func in (_per_exam_stats_loop, per_exam_stats):
+                start = time.perf_counter()
+                func(grades)
+                timings.append(time.perf_counter() - start)
+            loop, vectorized = timings
+            print(f"{n_students:>9} {n_exams:>6} {loop * 1000:>11.1f} "
+                  f"{vectorized * 1000:>16.1f} {loop / vectorized:>8.1f}x")
+
+
+def benchmark_cache(students: int = 200_000, exams: int = 20):
+    """Time CSV parsing vs. cold (parse + write) and warm (mmap) cached loads."""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "grades.csv")
+        df = pd.DataFrame({"First Name": [f"F{i}" for i in range(students)],
+                           "Last Name": [f"L{i}" for i in range(students)]})
+        for e in range(exams):
+            df[f"Exam {e + 1}"] = rng.integers(0, 101, size=students)
+        df.to_csv(filename, index=False)
+
+        runs = [("no cache (parse)", False), ("cold (parse + write)", True), ("warm (mmap)", True)]
+        print(f"{students:,} students × {exams} exams:")
+        for label, use_cache in runs:
+            start = time.perf_counter()
+            load_data(filename, use_cache)
+            print(f"  {label:22} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+
+def main(filename: str = "grades.csv", chunked: bool = None,
+         chunksize: int = CHUNK_ROWS, sketch_bins: int = SKETCH_BINS, use_cache: bool = True):
+    # big files are streamed in row blocks instead of loaded whole
+    if chunked is None:
+        chunked = os.path.getsize(filename) > CHUNKED_THRESHOLD
+    if chunked:
+        head, exam_stats, o = chunked_stats(filename, chunksize, sketch_bins)
+    else:
+        df, grades = load_data(filename, use_cache)
+        head, exam_stats, o = df.head(), per_exam_stats(grades), overall_stats(grades)
 
     # --- inspect dataset ----------------------------------------------------
     print("First five rows:")
-    print(df.head(), "\n")
+    print(head, "\n")
 
     # --- per‑exam statistics ------------------------------------------------
     print("Per‑exam statistics:")
-    for exam, s in per_exam_stats(grades).items():
+    for exam, s in exam_stats.items():
         print(f"Exam {exam}: "
               f"mean={s['mean']:.2f}, median={s['median']:.2f}, "
               f"std={s['std']:.2f}, min={s['min']:.0f}, max={s['max']:.0f}, "
               f"passed={s['passed']}, failed={s['failed']}")
 
     # --- overall statistics -------------------------------------------------
-    o = overall_stats(grades)
     print("\nOverall statistics (all exams combined):")
     print(f"mean={o['mean']:.2f}, median={o['median']:.2f}, "
           f"std={o['std']:.2f}, min={o['min']:.0f}, max={o['max']:.0f}, "
@@ -67,5 +444,26 @@ def main(filename: str = "grades.csv"):
 
 if __name__ == "__main__":
     # allow optional command‑line CSV path
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else "grades.csv"
-    main(csv_file)
+    parser = argparse.ArgumentParser(description="Exam grade statistics")
+    parser.add_argument("csv_file", nargs="?", default="grades.csv")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time per-exam stats across gradebook sizes")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--chunked", action="store_true", default=None,
+                      help="stream the CSV in row blocks (default: when > 512 MiB)")
+    mode.add_argument("--in-memory", dest="chunked", action="store_false",
+                      help="always load the whole CSV")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per block")
+    parser.add_argument("--sketch-bins", type=int, default=SKETCH_BINS,
+                        help="median sketch size in chunked mode")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="always parse the CSV, never use the binary cache")
+    parser.add_argument("--benchmark-cache", action="store_true",
+                        help="time cold vs. warm cached loads")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+    elif args.benchmark_cache:
+        benchmark_cache()
+    else:
+        main(args.csv_file, args.chunked, args.chunksize, args.sketch_bins, args.use_cache)
@@ -5,17 +5,41 @@ Creates an SQLite database called population_<initials>.db (default IH) containi
 Florida city population data for 2023, simulates 20 years of 2 % annual growth,
 and lets the user plot the growth for a chosen city.
 
-Run this file directly (`python population_IH.py`) and follow the prompt.
-Dependencies: sqlite3 (standard), matplotlib.
+Run this file directly (`python population_IH.py`) and follow the prompt, or
+use a subcommand (init, grow, query, plot, export, serve, loadtest, bench)
+for scripted runs; `serve` exposes the DB to dashboards over local HTTP.
+Dependencies: sqlite3 (standard), numpy, matplotlib.
+
+numpy, matplotlib and asyncio are imported inside the functions that need
+them, so init/query/export start without loading any of them and only
+plotting pays for matplotlib.
 """
 
+from __future__ import annotations
+
 import argparse
+import itertools
+import json
 import math
+import os
+import queue
+import random
+import re
 import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
+if TYPE_CHECKING:
+    import asyncio
+
+    import numpy as np
+    from matplotlib.figure import Figure
 
 
 # --------------------------------------------------------------------------- #
@@ -70,30 +94,800 @@ def create_database(initials: str = "IH") -> sqlite3.Connection:
     return conn
 
 
+def project_populations(base_pops: Sequence[int],
+                        years: int = GROWTH_YEARS,
+                        growth_rate: Union[float, np.ndarray] = GROWTH_RATE) -> np.ndarray:
+    """Return a (years, ..., cities) array of compounded populations.
+
+    ``growth_rate`` is a single rate or an array whose first axis is the year
+    and whose remaining axes broadcast against the cities (e.g. a
+    (years, cities) schedule or (years, paths, cities) random draws).
+
+    Every city advances together one year at a time, applying the same
+    per-step ``math.floor`` as the scalar formula, so the values match
+    ``math.floor(population * (1 + growth_rate))`` exactly.
+    """
+    import numpy as np
+
+    rates = np.asarray(growth_rate, dtype=np.float64)
+    if rates.ndim == 0:
+        rates = np.full(years, rates)
+    # float64 holds every population below 2**53 exactly, like Python's float()
+    pops = np.asarray(base_pops, dtype=np.float64)
+    out = np.empty((years,) + np.broadcast_shapes(pops.shape, rates.shape[1:]), dtype=np.int64)
+    for step in range(years):
+        pops = np.floor(pops * (1 + rates[step]))
+        out[step] = pops
+    return out
+
+
 def simulate_growth(conn: sqlite3.Connection,
                     years: int = GROWTH_YEARS,
-                    growth_rate: float = GROWTH_RATE) -> None:
+                    growth_rate: float = GROWTH_RATE,
+                    cities: Sequence[Tuple[str, int]] = CITIES_2023) -> None:
     """Simulate exponential growth and insert records for each future year."""
-    cur = conn.cursor()
+    names = [city for city, _ in cities]
+    trajectories = project_populations([pop for _, pop in cities], years, growth_rate)
+
+    rows = (
+        (city, START_YEAR + offset, pop)
+        for city, city_pops in zip(names, trajectories.T.tolist())
+        for offset, pop in enumerate(city_pops, start=1)
+    )
+
+    # One transaction and one executemany for all rows; skip fsyncs and give
+    # the B-tree a bigger page cache for the duration of the load
+    synchronous = conn.execute("PRAGMA synchronous;").fetchone()[0]
+    cache_size = conn.execute("PRAGMA cache_size;").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("PRAGMA cache_size = -65536;")  # 64 MiB
+    try:
+        if not conn.in_transaction:
+            conn.execute("BEGIN;")
+        conn.executemany(
+            "INSERT OR IGNORE INTO population (city, year, population) VALUES (?, ?, ?);",
+            rows,
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute(f"PRAGMA synchronous = {int(synchronous)};")
+        conn.execute(f"PRAGMA cache_size = {int(cache_size)};")
+
+    print(f"Inserted growth projections through {START_YEAR + years} (2 % annually).")
+
 
-    # For each city, fetch the 2023 population then simulate forward
-    for city, pop_2023 in CITIES_2023:
+def _simulate_growth_loop(conn: sqlite3.Connection,
+                          years: int = GROWTH_YEARS,
+                          growth_rate: float = GROWTH_RATE,
+                          cities: Sequence[Tuple[str, int]] = CITIES_2023) -> None:
+    """Original row-at-a-time simulate_growth, kept as the benchmark baseline."""
+    cur = conn.cursor()
+    for city, pop_2023 in cities:
         population = pop_2023
         for offset in range(1, years + 1):
             year = START_YEAR + offset
-            # Apply compounded growth
             population = math.floor(population * (1 + growth_rate))
             cur.execute(
                 "INSERT OR IGNORE INTO population (city, year, population) VALUES (?, ?, ?);",
                 (city, year, population),
             )
-
     conn.commit()
-    print(f"Inserted growth projections through {START_YEAR + years} (2 % annually).")
+
+
+# --------------------------------------------------------------------------- #
+# Scenarios
+# --------------------------------------------------------------------------- #
+RateSpec = Union[float, Sequence[float], Dict[str, Union[float, Sequence[float]]]]
+MC_CHUNK_VALUES = 1_000_000  # years * paths * cities projected per Monte Carlo chunk
+
+
+def create_scenario_tables(conn: sqlite3.Connection) -> None:
+    """Create the scenario catalogue and the scenario-keyed projection table."""
+    conn.executescript(
+        """CREATE TABLE IF NOT EXISTS scenario (
+                name TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                paths INTEGER NOT NULL,
+                years INTEGER NOT NULL,
+                description TEXT
+            );
+            CREATE TABLE IF NOT EXISTS scenario_population (
+                scenario TEXT NOT NULL,
+                city TEXT NOT NULL,
+                path INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                population INTEGER NOT NULL,
+                PRIMARY KEY(scenario, city, path, year)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_scenario_population_year
+                ON scenario_population (scenario, year, city);"""
+    )
+
+
+def rate_schedule(rates: RateSpec, years: int = GROWTH_YEARS,
+                  cities: Sequence[Tuple[str, int]] = CITIES_2023) -> np.ndarray:
+    """Expand a rate spec into a (years, cities) array.
+
+    ``rates`` is one rate for everything, a per-year list, or a dict mapping
+    city -> rate or city -> per-year list (other cities use GROWTH_RATE).
+    """
+    import numpy as np
+
+    names = [city for city, _ in cities]
+    if isinstance(rates, dict):
+        unknown = set(rates) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown cities in rate schedule: {sorted(unknown)}")
+        schedule = np.full((years, len(names)), GROWTH_RATE)
+        for idx, city in enumerate(names):
+            if city in rates:
+                schedule[:, idx] = rates[city]
+        return schedule
+    rates = np.asarray(rates, dtype=np.float64)
+    if rates.ndim == 1:
+        rates = rates[:, None]
+    return np.array(np.broadcast_to(rates, (years, len(names))))
+
+
+def _register_scenario(conn: sqlite3.Connection, name: str, kind: str,
+                       paths: int, years: int, description: str) -> None:
+    """(Re)create a scenario entry, dropping any rows of an older run."""
+    create_scenario_tables(conn)
+    with conn:
+        conn.execute("DELETE FROM scenario_population WHERE scenario = ?;", (name,))
+        conn.execute(
+            "INSERT OR REPLACE INTO scenario (name, kind, paths, years, description) "
+            "VALUES (?, ?, ?, ?, ?);",
+            (name, kind, paths, years, description),
+        )
+
+
+def _write_paths(conn: sqlite3.Connection, name: str, names: Sequence[str],
+                 base_pops: Sequence[int], trajectories: np.ndarray, first_path: int) -> int:
+    """Insert a (years, paths, cities) block in primary-key order; return row count.
+
+    Rows are streamed to executemany one city at a time, so only a single
+    city's slice of the block is ever held as Python ints.
+    """
+    years, n_paths, _ = trajectories.shape
+    year_list = list(range(START_YEAR, START_YEAR + years + 1))
+    rows = (
+        (name, city, first_path + path, year, pop)
+        for idx, (city, base) in enumerate(zip(names, base_pops))
+        for path, series in enumerate(trajectories[:, :, idx].T.tolist())  # path -> year
+        for year, pop in zip(year_list, [base] + series)
+    )
+    with conn:
+        conn.executemany(
+            "INSERT INTO scenario_population (scenario, city, path, year, population) "
+            "VALUES (?, ?, ?, ?, ?);",
+            rows,
+        )
+    return len(names) * n_paths * (years + 1)
+
+
+def run_scenario(conn: sqlite3.Connection, name: str, rates: RateSpec,
+                 years: int = GROWTH_YEARS,
+                 cities: Sequence[Tuple[str, int]] = CITIES_2023,
+                 description: str = "") -> int:
+    """Project a named deterministic scenario and store it as path 0.
+
+    A per-year rate list must hold exactly ``years`` rates; anything else
+    raises ValueError before the scenario is touched in the database.
+    """
+    import numpy as np
+
+    specs = rates.items() if isinstance(rates, dict) else [(None, rates)]
+    for city, spec in specs:
+        if np.ndim(spec) and len(spec) != years:
+            where = f" for {city}" if city is not None else ""
+            raise ValueError(f"Scenario {name!r}: expected {years} yearly rates{where}, "
+                             f"got {len(spec)}")
+    names = [city for city, _ in cities]
+    base_pops = [pop for _, pop in cities]
+    schedule = rate_schedule(rates, years, cities)
+    trajectories = project_populations(base_pops, years, schedule)[:, None, :]
+    _register_scenario(conn, name, "deterministic", 1, years, description)
+    return _write_paths(conn, name, names, base_pops, trajectories, 0)
+
+
+def _monte_carlo_chunk(base_pops: Sequence[int], years: int, mean_rate: float,
+                       rate_std: float, seed: np.random.SeedSequence, n_paths: int) -> np.ndarray:
+    """Worker: draw random yearly rates and project n_paths paths for every city."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    rates = rng.normal(mean_rate, rate_std, size=(years, n_paths, len(base_pops)))
+    return project_populations(base_pops, years, rates)
+
+
+def run_monte_carlo(conn: sqlite3.Connection, name: str, n_paths: int,
+                    years: int = GROWTH_YEARS,
+                    mean_rate: float = GROWTH_RATE,
+                    rate_std: float = 0.01,
+                    seed: Optional[int] = None,
+                    workers: Optional[int] = None,
+                    chunk_paths: Optional[int] = None,
+                    cities: Sequence[Tuple[str, int]] = CITIES_2023) -> int:
+    """Simulate n_paths random-rate paths per city and store them as a scenario.
+
+    Paths are generated in chunks of ``chunk_paths`` on a process pool, each
+    chunk with its own child of ``SeedSequence(seed)`` so results are
+    reproducible whatever the worker count.  By default a chunk holds about
+    MC_CHUNK_VALUES projected values, so its size shrinks as years and cities
+    grow.  This process is the only SQLite writer and commits each chunk as it
+    arrives; at most two chunks per worker are in flight, which keeps memory
+    bounded.
+    """
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+
+    names = [city for city, _ in cities]
+    base_pops = [pop for _, pop in cities]
+    if chunk_paths is None:
+        chunk_paths = max(1, MC_CHUNK_VALUES // (max(years, 1) * len(names)))
+    starts = list(range(0, n_paths, chunk_paths))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [(start, min(chunk_paths, n_paths - start), child) for start, child in zip(starts, seeds)]
+    _register_scenario(conn, name, "monte-carlo", n_paths, years,
+                       f"normal(mean={mean_rate}, std={rate_std}), seed={seed}")
+
+    written = 0
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for start, size, child in jobs:
+            block = _monte_carlo_chunk(base_pops, years, mean_rate, rate_std, child, size)
+            written += _write_paths(conn, name, names, base_pops, block, start)
+        return written
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, size, child in jobs:
+            pending.append((start, pool.submit(_monte_carlo_chunk, base_pops, years,
+                                               mean_rate, rate_std, child, size)))
+            if len(pending) >= 2 * workers:
+                first, future = pending.popleft()
+                written += _write_paths(conn, name, names, base_pops, future.result(), first)
+        while pending:
+            first, future = pending.popleft()
+            written += _write_paths(conn, name, names, base_pops, future.result(), first)
+    return written
+
+
+# --------------------------------------------------------------------------- #
+# Read-optimized query layer
+# --------------------------------------------------------------------------- #
+Series = Tuple[Tuple[int, int], ...]
+
+_SERIES_SQL = "SELECT year, population FROM population WHERE city = ? ORDER BY year;"
+_RANGE_SQL = ("SELECT year, population FROM population "
+              "WHERE city = ? AND year BETWEEN ? AND ? ORDER BY year;")
+_YEAR_SQL = "SELECT city, population FROM population WHERE year = ? ORDER BY city;"
+_SCENARIOS_SQL = "SELECT name, kind, paths, years, description FROM scenario ORDER BY name;"
+# "+year" keeps the planner on the (scenario, city, ...) primary key; grouping
+# by plain year would walk the whole scenario through the (scenario, year) index
+_COMPARE_SQL = ("SELECT scenario, year, AVG(population), MIN(population), MAX(population) "
+                "FROM scenario_population WHERE scenario = ? AND city = ? "
+                "GROUP BY +year ORDER BY +year;")
+_YEARS_SQL = ("SELECT city, year, population FROM population "
+              "WHERE year BETWEEN ? AND ? ORDER BY city, year;")
+
+
+class PopulationQueries:
+    """Thread-safe read layer over the population DB.
+
+    * switches the DB to WAL so readers never block (or get blocked by) the
+      writer in ``simulate_growth``;
+    * keeps a pool of read connections shared by all threads; each connection
+      caches its compiled statements, and the SQL strings here are constants,
+      so every query after the first reuses a prepared statement;
+    * keeps an LRU cache of per-city series, dropped whenever ``PRAGMA
+      data_version`` shows another connection (e.g. ``simulate_growth``) has
+      committed a write;
+    * adds a (year, city) covering index for year and year-range slices; city
+      and multi-city lookups use the (city, year) primary key.
+
+    A caller that waits more than ``pool_timeout`` seconds for a free pooled
+    connection gets a TimeoutError instead of blocking forever.
+    """
+
+    def __init__(self, db_path: Union[str, Path], pool_size: int = 4, cache_size: int = 256,
+                 pool_timeout: Optional[float] = None):
+        self.db_path = str(db_path)
+        self.cache_size = cache_size
+        self.pool_timeout = pool_timeout
+        self._cache: "OrderedDict[str, Series]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        with self._connect() as setup:
+            setup.execute("PRAGMA journal_mode = WAL;")
+            setup.execute(
+                "CREATE INDEX IF NOT EXISTS idx_population_year "
+                "ON population (year, city, population);"
+            )
+            setup.commit()
+
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON;")
+            self._pool.put(conn)
+        # a dedicated connection whose data_version tells us about new commits
+        self._watch = self._connect()
+        self._watch_lock = threading.Lock()
+        self._data_version = self._current_version()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+
+    def _current_version(self) -> int:
+        with self._watch_lock:
+            return self._watch.execute("PRAGMA data_version;").fetchone()[0]
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise TimeoutError("no free database connection") from None
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def invalidate(self) -> None:
+        """Drop every cached series."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _check_writes(self) -> None:
+        version = self._current_version()
+        if version != self._data_version:
+            self._data_version = version
+            self.invalidate()
+
+    def city_series(self, city: str) -> Series:
+        """Return ((year, population), ...) for one city, from the LRU cache if fresh."""
+        self._check_writes()
+        version = self._data_version
+        with self._cache_lock:
+            series = self._cache.get(city)
+            if series is not None:
+                self._cache.move_to_end(city)
+                return series
+        with self._connection() as conn:
+            series = tuple(conn.execute(_SERIES_SQL, (city,)).fetchall())
+        with self._cache_lock:
+            if version != self._data_version:
+                return series  # a write landed meanwhile; don't cache a stale read
+            self._cache[city] = series
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return series
+
+    def city_range(self, city: str, first_year: int, last_year: int) -> Series:
+        """Return one city's series restricted to first_year..last_year."""
+        with self._connection() as conn:
+            return tuple(conn.execute(_RANGE_SQL, (city, first_year, last_year)).fetchall())
+
+    def cities_series(self, cities: Sequence[str]) -> Dict[str, Series]:
+        """Return the series of several cities (cached ones are not re-queried)."""
+        return {city: self.city_series(city) for city in cities}
+
+    def year_slice(self, year: int) -> Dict[str, int]:
+        """Return {city: population} for a single year."""
+        with self._connection() as conn:
+            return dict(conn.execute(_YEAR_SQL, (year,)).fetchall())
+
+    def years_range(self, first_year: int, last_year: int) -> Dict[str, Series]:
+        """Return every city's series between first_year and last_year."""
+        result: Dict[str, List[Tuple[int, int]]] = {}
+        with self._connection() as conn:
+            for city, year, pop in conn.execute(_YEARS_SQL, (first_year, last_year)):
+                result.setdefault(city, []).append((year, pop))
+        return {city: tuple(series) for city, series in result.items()}
+
+    def scenarios(self) -> List[Dict[str, object]]:
+        """Return the scenario catalogue (empty if no scenario was ever run)."""
+        with self._connection() as conn:
+            if not _has_scenarios(conn):
+                return []
+            cur = conn.execute(_SCENARIOS_SQL)
+            columns = [col[0] for col in cur.description]
+            return [dict(zip(columns, row)) for row in cur]
+
+    def compare_scenarios(self, city: str,
+                          scenarios: Sequence[str] = ()) -> Dict[str, List[Tuple[int, float, int, int]]]:
+        """Return {scenario: [(year, mean, min, max), ...]} for one city.
+
+        Aggregates over a scenario's paths, so a Monte Carlo run compares as
+        its mean and range; with no names given, every scenario is compared.
+        """
+        names = list(scenarios) or [entry["name"] for entry in self.scenarios()]
+        result = {}
+        with self._connection() as conn:
+            if not _has_scenarios(conn):
+                return {}
+            for name in names:
+                rows = conn.execute(_COMPARE_SQL, (name, city)).fetchall()
+                result[name] = [(year, mean, low, high) for _, year, mean, low, high in rows]
+        return result
+
+    def iter_rows(self, sql: str, params: Sequence = (), batch_size: int = 1_000):
+        """Yield lists of up to batch_size rows, holding one pooled connection.
+
+        Closing the generator early returns the connection to the pool.
+        """
+        with self._connection() as conn:
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                cur.close()
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        self._watch.close()
+
+
+def _has_scenarios(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'scenario_population';"
+    ).fetchone() is not None
+
+
+# --------------------------------------------------------------------------- #
+# Local HTTP service
+# --------------------------------------------------------------------------- #
+SERVICE_THREADS = 4  # SQLite reader threads (and pooled connections)
+STREAM_BATCH = 1_000  # rows fetched and written per chunk of a streamed response
+POOL_TIMEOUT = 5.0  # seconds to wait for a pooled connection before replying 503
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           503: "Service Unavailable"}
+_STREAM_CITY_SQL = ("SELECT city, year, population FROM population "
+                    "WHERE year BETWEEN ? AND ? ORDER BY city, year;")
+_STREAM_SCENARIO_SQL = ("SELECT city, path, year, population FROM scenario_population "
+                        "WHERE scenario = ? ORDER BY city, path, year;")
+_STREAM_SCENARIO_CITY_SQL = ("SELECT city, path, year, population FROM scenario_population "
+                             "WHERE scenario = ? AND city = ? ORDER BY path, year;")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class PopulationService:
+    """Read-only asyncio HTTP/1.1 service over the population DB.
+
+    Endpoints (GET, JSON unless noted)::
+
+        /cities                        city names
+        /city/<name>[?from=&to=]       one city's (year, population) series
+        /year/<year>                   {city: population} for one year
+        /years?from=&to=               every city, streamed as NDJSON rows
+        /scenarios                     scenario catalogue
+        /compare/<city>[?scenario=..]  baseline vs. scenario mean/min/max
+        /scenario/<name>[?city=]       scenario paths, streamed as NDJSON rows
+
+    Every SQLite call runs on a ThreadPoolExecutor of ``threads`` workers,
+    so the event loop never blocks.  Large result sets are sent with chunked
+    transfer encoding, one batch of rows at a time, waiting for the client to
+    drain each chunk.  A streamed reply holds its pooled connection until it
+    ends, so streams get their own executor and at most ``threads`` of them
+    run at once; the PopulationQueries pool has a connection for every
+    worker of both executors, so a slow client never starves the other
+    requests.  A request that cannot get a connection (or a stream slot)
+    within POOL_TIMEOUT seconds is answered with 503.  Encoded
+    city series are kept alongside PopulationQueries' LRU entries, so a hot
+    city is neither queried nor re-serialized until the DB changes.
+    """
+
+    def __init__(self, db_path: Union[str, Path], threads: int = SERVICE_THREADS,
+                 cache_size: int = 256):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.queries = PopulationQueries(db_path, pool_size=2 * threads, cache_size=cache_size,
+                                         pool_timeout=POOL_TIMEOUT)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="sqlite")
+        self._stream_executor = ThreadPoolExecutor(max_workers=threads,
+                                                   thread_name_prefix="sqlite-stream")
+        self._stream_slots = asyncio.Semaphore(threads)
+        # city -> (series tuple it was encoded from, encoded body)
+        self._encoded: Dict[str, Tuple[Series, bytes]] = {}
+
+    async def _run(self, func, *args, executor=None):
+        import asyncio
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor or self._executor, func, *args)
+        except TimeoutError as exc:
+            raise HTTPError(503, str(exc)) from None
+
+    # -- endpoints --------------------------------------------------------- #
+    def _city_body(self, city: str) -> bytes:
+        series = self.queries.city_series(city)
+        cached = self._encoded.get(city)
+        if cached is not None and cached[0] is series:
+            return cached[1]
+        if not series:
+            raise HTTPError(404, f"No data found for {city}.")
+        body = json.dumps({"city": city, "series": series}).encode()
+        if len(self._encoded) >= self.queries.cache_size:
+            self._encoded.clear()
+        self._encoded[city] = (series, body)
+        return body
+
+    def _compare(self, city: str, scenarios: Sequence[str]) -> Dict[str, object]:
+        baseline = self.queries.city_series(city)
+        if not baseline:
+            raise HTTPError(404, f"No data found for {city}.")
+        if scenarios:
+            known = {entry["name"] for entry in self.queries.scenarios()}
+            unknown = [name for name in scenarios if name not in known]
+            if unknown:
+                raise HTTPError(404, f"Unknown scenario {', '.join(unknown)}.")
+        return {"city": city, "baseline": baseline,
+                "scenarios": self.queries.compare_scenarios(city, scenarios)}
+
+    async def _route(self, path: str, params: Dict[str, List[str]]):
+        """Return (body bytes) or (sql, params, row -> dict) for a streamed reply."""
+        from urllib.parse import unquote
+
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        try:
+            if parts == ["cities"]:
+                return json.dumps(list(await self._run(self.queries.year_slice, START_YEAR))).encode()
+            if len(parts) == 2 and parts[0] == "city":
+                if "from" in params or "to" in params:
+                    series = await self._run(self.queries.city_range, parts[1],
+                                             int(params.get("from", [START_YEAR])[0]),
+                                             int(params.get("to", [9999])[0]))
+                    return json.dumps({"city": parts[1], "series": series}).encode()
+                return await self._run(self._city_body, parts[1])
+            if len(parts) == 2 and parts[0] == "year":
+                return json.dumps(await self._run(self.queries.year_slice, int(parts[1]))).encode()
+            if parts == ["years"]:
+                span = (int(params.get("from", [START_YEAR])[0]), int(params.get("to", [9999])[0]))
+                return (_STREAM_CITY_SQL, span,
+                        lambda row: {"city": row[0], "year": row[1], "population": row[2]})
+            if parts == ["scenarios"]:
+                return json.dumps(await self._run(self.queries.scenarios)).encode()
+            if len(parts) == 2 and parts[0] == "compare":
+                body = await self._run(self._compare, parts[1], params.get("scenario", []))
+                return json.dumps(body).encode()
+            if len(parts) == 2 and parts[0] == "scenario":
+                if not await self._run(self._scenario_exists, parts[1]):
+                    raise HTTPError(404, f"Unknown scenario {parts[1]}.")
+                if "city" in params:
+                    query = (_STREAM_SCENARIO_CITY_SQL, (parts[1], params["city"][0]))
+                else:
+                    query = (_STREAM_SCENARIO_SQL, (parts[1],))
+                return query + (lambda row: {"city": row[0], "path": row[1],
+                                             "year": row[2], "population": row[3]},)
+        except ValueError as exc:
+            raise HTTPError(400, str(exc)) from None
+        raise HTTPError(404, f"No such endpoint: {path}")
+
+    def _scenario_exists(self, name: str) -> bool:
+        return any(entry["name"] == name for entry in self.queries.scenarios())
+
+    # -- HTTP plumbing ----------------------------------------------------- #
+    @staticmethod
+    def _head(status: int, content_type: str, length: Optional[int]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_STATUS[status]}", f"Content-Type: {content_type}"]
+        lines.append(f"Content-Length: {length}" if length is not None
+                     else "Transfer-Encoding: chunked")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    async def _stream(self, writer: asyncio.StreamWriter, sql: str, params: Sequence,
+                      to_dict) -> None:
+        import asyncio
+
+        try:
+            await asyncio.wait_for(self._stream_slots.acquire(), self.queries.pool_timeout)
+        except TimeoutError:
+            raise HTTPError(503, "too many streamed responses in progress") from None
+        batches = self.queries.iter_rows(sql, params, STREAM_BATCH)
+        try:
+            # fetch the first batch before the head, so a 503 can still be sent
+            rows = await self._run(next, batches, None, executor=self._stream_executor)
+            writer.write(self._head(200, "application/x-ndjson", None))
+            while rows is not None:
+                chunk = "".join(json.dumps(to_dict(row)) + "\n" for row in rows).encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+                rows = await self._run(next, batches, None, executor=self._stream_executor)
+            writer.write(b"0\r\n\r\n")
+        finally:
+            await self._run(batches.close, executor=self._stream_executor)
+            self._stream_slots.release()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve keep-alive requests on one connection until the client leaves."""
+        import asyncio
+        from urllib.parse import parse_qs, urlsplit
+
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = request.decode("latin-1").split("\r\n")
+                method, target, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+                url = urlsplit(target)
+                try:
+                    if method != "GET":
+                        raise HTTPError(405, f"{method} not allowed")
+                    result = await self._route(url.path, parse_qs(url.query))
+                    if isinstance(result, bytes):
+                        writer.write(self._head(200, "application/json", len(result)) + result)
+                    else:
+                        await self._stream(writer, *result)
+                except HTTPError as exc:
+                    body = json.dumps({"error": str(exc)}).encode()
+                    writer.write(self._head(exc.status, "application/json", len(body)) + body)
+                await writer.drain()
+                if (headers.get("connection", "").lower() == "close"
+                        or version == "HTTP/1.0"):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # client closed the connection or sent garbage
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000, ready=None) -> None:
+        """Run until cancelled; ``ready`` (if given) is called with the bound port."""
+        import asyncio
+
+        server = await asyncio.start_server(self.handle, host, port)
+        bound = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(bound)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self._stream_executor.shutdown()
+        self.queries.close()
+
+
+# --------------------------------------------------------------------------- #
+# Headless batch rendering
+# --------------------------------------------------------------------------- #
+BASELINE = "baseline"  # output folder for the plain population table
+
+# One Figure per worker process, cleared and reused for every chart it draws
+_worker_figure: Optional[Figure] = None
+
+
+def _chart_filename(city: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", city).strip("_") or "city"
+
+
+def _render_chart(out_dir: str, scenario: str, city: str, years: Sequence[int],
+                  paths: np.ndarray, formats: Sequence[str]) -> List[str]:
+    """Worker: draw one city's series (or Monte Carlo fan) and save it."""
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    global _worker_figure
+    if _worker_figure is None:
+        _worker_figure = Figure(figsize=(6.4, 4.8))
+        FigureCanvasAgg(_worker_figure)  # Agg canvas: no display needed
+    fig = _worker_figure
+    fig.clear()
+    ax = fig.add_subplot()
+
+    if paths.shape[0] == 1:
+        ax.plot(years, paths[0], marker="o")
+    else:
+        low, median, high = np.percentile(paths, [5, 50, 95], axis=0)
+        ax.fill_between(years, low, high, alpha=0.3, label="5–95 %")
+        ax.plot(years, median, label=f"median of {paths.shape[0]:,} paths")
+        ax.legend()
+    title = f"Population growth for {city}"
+    ax.set_title(title if scenario == BASELINE else f"{title} ({scenario})")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Population")
+    ax.grid(True)
+    fig.tight_layout()
+
+    folder = Path(out_dir) / _chart_filename(scenario)
+    folder.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt in formats:
+        target = folder / f"{_chart_filename(city)}.{fmt}"
+        fig.savefig(target, format=fmt)
+        written.append(str(target))
+    return written
+
+
+def _iter_chart_series(db_path: Union[str, Path], include_scenarios: bool):
+    """Yield (scenario, city, years, paths) groups from one query per table."""
+    import numpy as np
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT city, year, population FROM population ORDER BY city, year;")
+        for city, group in itertools.groupby(rows, key=lambda row: row[0]):
+            series = [(year, pop) for _, year, pop in group]
+            years = [year for year, _ in series]
+            yield BASELINE, city, years, np.array([[pop for _, pop in series]])
+
+        if not (include_scenarios and _has_scenarios(conn)):
+            return
+        rows = conn.execute(
+            "SELECT scenario, city, path, year, population FROM scenario_population "
+            "ORDER BY scenario, city, path, year;"
+        )
+        for (scenario, city), group in itertools.groupby(rows, key=lambda row: row[:2]):
+            paths: Dict[int, List[int]] = {}
+            years_seen: Dict[int, None] = {}
+            for _, _, path, year, pop in group:
+                paths.setdefault(path, []).append(pop)
+                years_seen[year] = None
+            yield scenario, city, list(years_seen), np.array(list(paths.values()))
+    finally:
+        conn.close()
+
+
+def render_all_charts(db_path: Union[str, Path], out_dir: Union[str, Path],
+                      formats: Sequence[str] = ("png",),
+                      workers: Optional[int] = None,
+                      include_scenarios: bool = True) -> int:
+    """Render a chart for every city (and scenario) without a display.
+
+    All series are streamed from a single ordered query per table and fanned
+    out to a process pool; each worker reuses one Agg figure.  Files land in
+    ``out_dir/<scenario>/<city>.<fmt>`` (``baseline`` for the population
+    table).  Returns the number of files written.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    groups = _iter_chart_series(db_path, include_scenarios)
+    written = 0
+    if workers == 1:
+        for scenario, city, years, paths in groups:
+            written += len(_render_chart(str(out_dir), scenario, city, years, paths, formats))
+        return written
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for scenario, city, years, paths in groups:
+            pending.append(pool.submit(_render_chart, str(out_dir), scenario, city,
+                                       years, paths, tuple(formats)))
+            if len(pending) >= 2 * workers:
+                written += len(pending.popleft().result())
+        while pending:
+            written += len(pending.popleft().result())
+    return written
 
 
 def plot_city_growth(conn: sqlite3.Connection, city: str) -> None:
     """Query DB for a single city and plot its population trajectory."""
+    import matplotlib.pyplot as plt
+
     cur = conn.cursor()
     cur.execute(
         "SELECT year, population FROM population WHERE city = ? ORDER BY year;", (city,)
@@ -115,24 +909,325 @@ def plot_city_growth(conn: sqlite3.Connection, city: str) -> None:
 
 
 # --------------------------------------------------------------------------- #
-# Main CLI
+# Benchmark
 # --------------------------------------------------------------------------- #
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Florida city population DB & visualizer"
-    )
-    parser.add_argument(
-        "-i", "--initials", default="IH", help="Your initials for DB filename"
-    )
-    parser.add_argument(
-        "--no-grow", action="store_true", help="Skip growth simulation insertions"
+def benchmark_growth(n_cities: int = 2_000, years: int = 100) -> None:
+    """Compare rows/second of the batched and the row-at-a-time growth insert."""
+    import numpy  # loaded before the timers so the batched run is not charged for the import
+
+    cities = [(f"City {i}", 10_000 + 37 * i) for i in range(n_cities)]
+    n_rows = n_cities * years
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, func in (("row-at-a-time", _simulate_growth_loop),
+                            ("batched", simulate_growth)):
+            conn = sqlite3.connect(Path(tmp) / f"{label}.db")
+            conn.execute(
+                "CREATE TABLE population (city TEXT NOT NULL, year INTEGER NOT NULL, "
+                "population INTEGER NOT NULL, PRIMARY KEY(city, year));"
+            )
+            start = time.perf_counter()
+            func(conn, years, GROWTH_RATE, cities)
+            elapsed = time.perf_counter() - start
+            results[label] = conn.execute(
+                "SELECT city, year, population FROM population ORDER BY city, year;"
+            ).fetchall()
+            conn.close()
+            print(f"{label:>14}: {n_rows:,} rows in {elapsed:.2f} s "
+                  f"({n_rows / elapsed:,.0f} rows/s)")
+    print("Results identical:", results["row-at-a-time"] == results["batched"])
+
+
+def benchmark_queries(n_cities: int = 2_000, years: int = 100, readers: int = 8,
+                      queries_per_reader: int = 2_000) -> None:
+    """Per-query latency of city_series under concurrent reader threads."""
+    cities = [(f"City {i}", 10_000 + 37 * i) for i in range(n_cities)]
+    names = [city for city, _ in cities]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "queries.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE population (city TEXT NOT NULL, year INTEGER NOT NULL, "
+            "population INTEGER NOT NULL, PRIMARY KEY(city, year));"
+        )
+        simulate_growth(conn, years, GROWTH_RATE, cities)
+        conn.close()
+
+        for label, cache_size in (("no cache", 0), ("LRU cache", n_cities)):
+            layer = PopulationQueries(db_path, pool_size=readers, cache_size=cache_size)
+            latencies: List[float] = []
+            lock = threading.Lock()
+
+            def reader(seed: int) -> None:
+                rng = random.Random(seed)
+                local = []
+                for _ in range(queries_per_reader):
+                    # skewed access: a few hot cities get most of the traffic
+                    city = names[min(int(rng.expovariate(1 / 50)), n_cities - 1)]
+                    start = time.perf_counter()
+                    layer.city_series(city)
+                    local.append(time.perf_counter() - start)
+                with lock:
+                    latencies.extend(local)
+
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+            wall = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall = time.perf_counter() - wall
+            layer.close()
+
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1e6
+            p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+            print(f"{label:>10}: {readers} readers, p50 {p50:,.0f} µs, p99 {p99:,.0f} µs, "
+                  f"{len(latencies) / wall:,.0f} queries/s")
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    """Read one HTTP/1.1 response (sized or chunked); return the body length."""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").lower()
+    if "transfer-encoding: chunked" in head:
+        total = 0
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                return total
+            total += size
+    length = int(head.split("content-length:", 1)[1].split("\r\n", 1)[0])
+    await reader.readexactly(length)
+    return length
+
+
+async def load_test(host: str = "127.0.0.1", port: int = 8000,
+                    paths: Sequence[str] = (), concurrency: int = 32,
+                    duration: float = 10.0) -> Dict[str, float]:
+    """Hammer a running service from keep-alive clients; report latency and rate.
+
+    Each of ``concurrency`` clients picks a path from ``paths`` (default: a
+    skewed mix of city series, year slices and comparisons) and issues it as
+    soon as the previous response is read.
+    """
+    import asyncio
+    from urllib.parse import quote
+
+    if not paths:
+        names = [city for city, _ in CITIES_2023]
+        hot = [f"/city/{quote(city)}" for city in names]
+        paths = hot * 8 + [f"/year/{START_YEAR + i}" for i in range(GROWTH_YEARS + 1)] + \
+            [f"/compare/{quote(city)}" for city in names]
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def client(seed: int) -> None:
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                path = rng.choice(paths)
+                start = time.perf_counter()
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+                await _read_response(reader)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    wall = time.perf_counter() - wall
+
+    latencies.sort()
+    report = {
+        "requests": len(latencies),
+        "rps": len(latencies) / wall,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+    print(f"{report['requests']:,} requests from {concurrency} clients in {wall:.1f} s: "
+          f"{report['rps']:,.0f} req/s, p50 {report['p50_ms']:.2f} ms, "
+          f"p99 {report['p99_ms']:.2f} ms")
+    return report
+
+
+def benchmark_service(initials: str = "IH", concurrency: int = 32,
+                      duration: float = 5.0, threads: int = SERVICE_THREADS) -> None:
+    """Start ``serve`` in a subprocess on a free port and load-test it."""
+    import asyncio
+    import subprocess
+
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "-i", initials, "serve",
+         "--port", "0", "--threads", str(threads)],
+        stdout=subprocess.PIPE, text=True,
     )
-    args = parser.parse_args()
+    try:
+        line = server.stdout.readline()  # "Serving http://host:port ..."
+        port = int(re.search(r":(\d+)", line).group(1))
+        asyncio.run(load_test("127.0.0.1", port, concurrency=concurrency, duration=duration))
+    finally:
+        server.terminate()
+        server.wait()
+
 
+def benchmark_startup(runs: int = 5, budget_ms: Optional[float] = None) -> bool:
+    """Measure CLI start-up with ``-X importtime`` and flag heavy imports.
+
+    Runs ``python -X importtime <this file> init --help`` (nothing but imports
+    and argument parsing) ``runs`` times and reports the best wall time and
+    the summed top-level import time.  Returns False if numpy/matplotlib
+    were imported on that path or the wall time exceeds ``budget_ms``.
+    """
+    import subprocess
+
+    script = str(Path(__file__).resolve())
+    best_wall = math.inf
+    best_import = math.inf
+    heavy: List[str] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", script, "init", "--help"],
+                              capture_output=True, text=True, check=True)
+        best_wall = min(best_wall, time.perf_counter() - start)
+        modules = {}
+        for line in proc.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+                _, cumulative, name = line[12:].split("|")
+                modules[name.rstrip()[1:]] = int(cumulative)
+        heavy = sorted(m.strip() for m in modules
+                       if m.strip().split(".")[0] in ("numpy", "matplotlib"))
+        # Only top-level (unindented) entries, so nested imports count once
+        imported = sum(us for name, us in modules.items() if not name.startswith(" "))
+        best_import = min(best_import, imported)
+
+    print(f"start-up ({runs} runs, best): wall {best_wall * 1000:.1f} ms, "
+          f"imports {best_import / 1000:.1f} ms")
+    ok = True
+    if heavy:
+        print(f"REGRESSION: heavy modules imported at start-up: {', '.join(heavy[:5])}")
+        ok = False
+    if budget_ms is not None and best_wall * 1000 > budget_ms:
+        print(f"REGRESSION: start-up {best_wall * 1000:.1f} ms exceeds budget {budget_ms} ms")
+        ok = False
+    return ok
+
+
+# --------------------------------------------------------------------------- #
+# Main CLI
+# --------------------------------------------------------------------------- #
+def _db_path(initials: str) -> str:
+    return f"population_{initials}.db"
+
+
+def _cmd_init(args: argparse.Namespace) -> None:
+    create_database(args.initials).close()
+
+
+def _cmd_grow(args: argparse.Namespace) -> None:
     conn = create_database(args.initials)
-    if not args.no_grow:
-        simulate_growth(conn)
+    if args.monte_carlo:
+        rows = run_monte_carlo(conn, args.scenario or "monte-carlo", args.monte_carlo,
+                               args.years, args.rate, args.rate_std, args.seed, args.workers)
+        print(f"Stored {rows:,} Monte Carlo rows.")
+    elif args.scenario:
+        rows = run_scenario(conn, args.scenario, args.rate, args.years)
+        print(f"Stored scenario {args.scenario} ({rows:,} rows).")
+    else:
+        simulate_growth(conn, args.years, args.rate)
+    conn.close()
+
+
+def _cmd_query(args: argparse.Namespace) -> None:
+    layer = PopulationQueries(_db_path(args.initials), pool_size=1)
+    try:
+        if args.year is not None:
+            for city, pop in layer.year_slice(args.year).items():
+                print(f"{city}\t{pop}")
+            return
+        for city in args.cities:
+            if args.first is not None or args.last is not None:
+                series = layer.city_range(city, args.first or START_YEAR, args.last or 9999)
+            else:
+                series = layer.city_series(city)
+            if not series:
+                print(f"No data found for {city}.")
+            for year, pop in series:
+                print(f"{city}\t{year}\t{pop}")
+    finally:
+        layer.close()
+
+
+def _cmd_plot(args: argparse.Namespace) -> None:
+    if args.all:
+        start = time.perf_counter()
+        count = render_all_charts(_db_path(args.initials), args.all, args.format, args.workers)
+        print(f"Wrote {count} chart files to {args.all} "
+              f"in {time.perf_counter() - start:.1f} s.")
+        return
+    conn = create_database(args.initials)
+    if args.city:
+        plot_city_growth(conn, args.city)
+    else:
+        _prompt_and_plot(conn)
+
+
+def _cmd_export(args: argparse.Namespace) -> None:
+    import csv
+
+    conn = sqlite3.connect(_db_path(args.initials))
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        rows = conn.execute("SELECT city, year, population FROM population ORDER BY city, year;")
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["city", "year", "population"])
+            writer.writerows(rows)
+        else:
+            for city, year, pop in rows:
+                out.write(json.dumps({"city": city, "year": year, "population": pop}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        conn.close()
+
+
+def _cmd_serve(args: argparse.Namespace) -> None:
+    import asyncio
+
+    service = PopulationService(_db_path(args.initials), threads=args.threads)
+
+    def ready(port: int) -> None:
+        print(f"Serving http://{args.host}:{port} (Ctrl+C to stop)", flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+def _cmd_loadtest(args: argparse.Namespace) -> None:
+    import asyncio
+
+    asyncio.run(load_test(args.host, args.port, args.path, args.concurrency, args.duration))
+
 
+def _cmd_bench(args: argparse.Namespace) -> None:
+    if args.what == "service":
+        benchmark_service(args.initials)
+    elif args.what == "growth":
+        benchmark_growth()
+    elif args.what == "queries":
+        benchmark_queries()
+    elif not benchmark_startup(budget_ms=args.budget_ms):
+        sys.exit(1)
+
+
+def _prompt_and_plot(conn: sqlite3.Connection) -> None:
     # Prompt user for city choice
     cities = [c for c, _ in CITIES_2023]
     print("\nAvailable cities:")
@@ -148,5 +1243,86 @@ def main() -> None:
         print("Input must be a number.")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Florida city population DB & visualizer"
+    )
+    parser.add_argument(
+        "-i", "--initials", default="IH", help="Your initials for DB filename"
+    )
+    parser.add_argument(
+        "--no-grow", action="store_true",
+        help="Skip growth simulation insertions (interactive mode only)"
+    )
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    p = sub.add_parser("init", help="Create the DB with 2023 data")
+    p.set_defaults(func=_cmd_init)
+
+    p = sub.add_parser("grow", help="Insert growth projections or a scenario")
+    p.add_argument("--years", type=int, default=GROWTH_YEARS, help="Years to project")
+    p.add_argument("--rate", type=float, default=GROWTH_RATE, help="(Mean) annual growth rate")
+    p.add_argument("--scenario", help="Store as a named scenario instead of the base table")
+    p.add_argument("--monte-carlo", type=int, metavar="PATHS",
+                   help="Simulate PATHS random-rate paths per city")
+    p.add_argument("--rate-std", type=float, default=0.01, help="Rate std. dev. for Monte Carlo")
+    p.add_argument("--seed", type=int, help="Random seed for Monte Carlo")
+    p.add_argument("-w", "--workers", type=int, help="Worker processes for Monte Carlo")
+    p.set_defaults(func=_cmd_grow)
+
+    p = sub.add_parser("query", help="Print population series")
+    p.add_argument("cities", nargs="*", help="City names")
+    p.add_argument("--from", dest="first", type=int, help="First year")
+    p.add_argument("--to", dest="last", type=int, help="Last year")
+    p.add_argument("--year", type=int, help="Print every city for one year instead")
+    p.set_defaults(func=_cmd_query)
+
+    p = sub.add_parser("plot", help="Plot a city (prompt if none given) or render all charts")
+    p.add_argument("city", nargs="?", help="City to plot")
+    p.add_argument("--all", metavar="OUT_DIR",
+                   help="Write charts for every city/scenario to OUT_DIR (headless)")
+    p.add_argument("--format", nargs="+", default=["png"], choices=["png", "svg"],
+                   help="Chart file formats for --all")
+    p.add_argument("-w", "--workers", type=int, help="Worker processes for --all")
+    p.set_defaults(func=_cmd_plot)
+
+    p = sub.add_parser("export", help="Export the population table")
+    p.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    p.add_argument("-o", "--output", help="Output file (default: stdout)")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("serve", help="Serve the DB over local HTTP (JSON)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000, help="0 picks a free port")
+    p.add_argument("--threads", type=int, default=SERVICE_THREADS,
+                   help="SQLite reader threads")
+    p.set_defaults(func=_cmd_serve)
+
+    p = sub.add_parser("loadtest", help="Load-test a running service")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--path", action="append", default=[],
+                   help="Request path (repeatable; default: a mix of endpoints)")
+    p.add_argument("-c", "--concurrency", type=int, default=32, help="Concurrent clients")
+    p.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run")
+    p.set_defaults(func=_cmd_loadtest)
+
+    p = sub.add_parser("bench", help="Run a benchmark")
+    p.add_argument("what", choices=["growth", "queries", "service", "startup"])
+    p.add_argument("--budget-ms", type=float, help="Fail startup bench above this wall time")
+    p.set_defaults(func=_cmd_bench)
+
+    args = parser.parse_args()
+    if args.command:
+        args.func(args)
+        return
+
+    # No subcommand: the original interactive flow
+    conn = create_database(args.initials)
+    if not args.no_grow:
+        simulate_growth(conn)
+    _prompt_and_plot(conn)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()